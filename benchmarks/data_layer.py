@@ -0,0 +1,103 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+
+from report import (add_compare_command, compare, merge_runs, new_report, peak_rss_mb, run_worker, summarize,
+                    timed, write_report)
+from synthetic import fill_database, generate_tasks
+from todo_core import DatabaseManager
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+DEFAULT_OPERATIONS = 500
+DEFAULT_REPEAT = 1
+LOAD_REPEATS = 3
+
+
+def benchmark_size(size, operations, seed):
+    rng = random.Random(seed)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseManager(os.path.join(directory, "bench.db"))
+        setup_s, _ = timed(fill_database, db, size, seed)
+
+        latencies = []
+        for _ in range(LOAD_REPEATS):
+            elapsed, tasks = timed(db.get_all_tasks)
+            latencies.append(elapsed)
+            del tasks
+        results["get_all_tasks"] = summarize(latencies, size * LOAD_REPEATS)
+
+        operations = min(operations, size // 4)
+        new_tasks = [
+            {"title": title, "description": description, "deadline": deadline, "date_of_creation": created,
+             "tags": tags, "image": None}
+            for title, description, deadline, created, completed, completed_at, tags
+            in generate_tasks(operations, seed + 1)
+        ]
+        results["add_task"] = summarize([timed(db.add_task, task_data)[0] for task_data in new_tasks])
+
+        task_ids = rng.sample(range(1, size + 1), 3 * operations)
+        update_ids = task_ids[:operations]
+        complete_ids = task_ids[operations:2 * operations]
+        delete_ids = task_ids[2 * operations:]
+
+        results["update_task"] = summarize([
+            timed(db.update_task, task_id, {**task_data, "title": f"{task_data['title']} (изменено)"})[0]
+            for task_id, task_data in zip(update_ids, new_tasks)
+        ])
+        results["complete_task"] = summarize([timed(db.complete_task, task_id)[0] for task_id in complete_ids])
+        results["delete_task"] = summarize([timed(db.delete_task, task_id)[0] for task_id in delete_ids])
+
+        completed = db.conn.execute("SELECT COUNT(*) FROM tasks WHERE completed = 1").fetchone()[0]
+        elapsed, _ = timed(db.clear_completed_tasks)
+        results["clear_completed_tasks"] = summarize([elapsed], completed)
+        db.close()
+
+    return {"setup_s": round(setup_s, 3), "peak_rss_mb": peak_rss_mb(), "operations": results}
+
+
+def run(args):
+    report = new_report("data_layer", operations_per_size=args.operations, repeat=args.repeat)
+
+    for size in args.sizes:
+        print(f"{size} задач...", file=sys.stderr, flush=True)
+        runs = [run_worker(__file__, size, args.operations, args.seed) for _ in range(args.repeat)]
+        report["sizes"][str(size)] = merge_runs(runs)
+
+    write_report(report, args.output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки DatabaseManager")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="замерить операции и записать JSON")
+    run_parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    run_parser.add_argument("--operations", type=int, default=DEFAULT_OPERATIONS)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                            help="сколько раз прогнать каждый размер; берётся медиана")
+    run_parser.add_argument("--output", help="по умолчанию benchmarks/results/data_layer-<коммит>.json")
+
+    add_compare_command(commands)
+
+    worker_parser = commands.add_parser("worker")
+    worker_parser.add_argument("size", type=int)
+    worker_parser.add_argument("operations", type=int)
+    worker_parser.add_argument("seed", type=int)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    elif args.command == "compare":
+        sys.exit(compare(args.base, args.new, args.threshold, args.min_delta_ms))
+    else:
+        print(json.dumps(benchmark_size(args.size, args.operations, args.seed)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from report import add_compare_command, compare, merge_runs, new_report, peak_rss_mb, run_worker, summarize, \
+    timed, write_report
+from synthetic import fill_database, load_app
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_ACTIONS = 50
+DEFAULT_REPEAT = 1
+REFRESH_REPEATS = 20
+SCROLL_STEPS = 200
+FULL_LOAD_LIMIT = 100000
+WAIT_TIMEOUT = 30
+
+
+class Probe:
+    def __init__(self, app, qt_app, window):
+        from PyQt6.QtCore import QEvent, QObject, QTimer
+
+        class PaintFilter(QObject):
+            def eventFilter(filter_self, watched, event):
+                if event.type() == QEvent.Type.Paint:
+                    self.last_paint = time.perf_counter()
+                return False
+
+        self.app = app
+        self.qt_app = qt_app
+        self.window = window
+        self.last_paint = None
+        self.paint_filter = PaintFilter()
+        window.tasks_list.viewport().installEventFilter(self.paint_filter)
+
+        self.last_tick = None
+        self.max_stall = 0.0
+        self.ticker = QTimer()
+        self.ticker.setInterval(1)
+        self.ticker.timeout.connect(self.on_tick)
+        self.ticker.start()
+
+    def on_tick(self):
+        now = time.perf_counter()
+        if self.last_tick is not None:
+            self.max_stall = max(self.max_stall, now - self.last_tick)
+        self.last_tick = now
+
+    def reset_stall(self):
+        self.last_tick = time.perf_counter()
+        self.max_stall = 0.0
+
+    def stall_ms(self):
+        return round(self.max_stall * 1000, 2)
+
+    def wait_until(self, condition, timeout=WAIT_TIMEOUT):
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("интерфейс не ответил вовремя")
+            self.qt_app.processEvents()
+            time.sleep(0.0005)
+
+    def settle(self):
+        self.wait_until(lambda: not self.window.db.callbacks and not self.window.tasks_model.fetching)
+        self.qt_app.processEvents()
+
+    def painted_since(self, start):
+        return self.last_paint is not None and self.last_paint >= start
+
+    def repaint(self):
+        self.window.tasks_list.viewport().repaint()
+
+
+def measure_first_paint(app, qt_app):
+    start = time.perf_counter()
+    window = app.MainWindow()
+    window.show()
+    probe = Probe(app, qt_app, window)
+    probe.wait_until(lambda: window.tasks_model.rowCount() > 0 and probe.painted_since(start))
+    return window, probe, time.perf_counter() - start
+
+
+def measure_refresh(probe):
+    window = probe.window
+    latencies = []
+    probe.reset_stall()
+    for _ in range(REFRESH_REPEATS):
+        start = time.perf_counter()
+        window.tasks.reset()
+        window.tasks_model.fetchMore()
+        probe.wait_until(lambda: window.tasks_model.rowCount() > 0 and probe.painted_since(start))
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies, max_stall_ms=probe.stall_ms())
+
+
+def measure_full_load(probe):
+    window = probe.window
+    probe.reset_stall()
+    start = time.perf_counter()
+    window.tasks.reset()
+    while window.tasks.has_more:
+        window.tasks_model.fetchMore()
+        probe.settle()
+    elapsed = time.perf_counter() - start
+    return summarize([elapsed], len(window.tasks), max_stall_ms=probe.stall_ms())
+
+
+def measure_scroll(probe):
+    scroll_bar = probe.window.tasks_list.verticalScrollBar()
+    scroll_bar.setValue(0)
+    probe.settle()
+
+    latencies = []
+    probe.reset_stall()
+    for _ in range(SCROLL_STEPS):
+        start = time.perf_counter()
+        scroll_bar.setValue(scroll_bar.value() + scroll_bar.pageStep())
+        probe.repaint()
+        latencies.append(time.perf_counter() - start)
+        probe.qt_app.processEvents()
+    probe.settle()
+    return summarize(latencies, max_stall_ms=probe.stall_ms())
+
+
+def measure_action(probe, action, answer, count):
+    from PyQt6.QtCore import QTimer
+
+    window = probe.window
+    window.tasks_list.verticalScrollBar().setValue(0)
+    probe.settle()
+
+    latencies = []
+    probe.reset_stall()
+    for _ in range(count):
+        window.tasks_list.setCurrentIndex(window.tasks_model.index(0))
+        if answer is not None:
+            QTimer.singleShot(0, answer)
+        start = time.perf_counter()
+        action()
+        probe.repaint()
+        latencies.append(time.perf_counter() - start)
+        probe.settle()
+    return summarize(latencies, max_stall_ms=probe.stall_ms())
+
+
+def accept_task_dialog(app):
+    dialog = app.QApplication.activeModalWidget()
+    dialog.title_input.setText(f"{dialog.title_input.text()}!")
+    dialog.accept()
+
+
+def confirm_message_box(app):
+    box = app.QApplication.activeModalWidget()
+    box.button(app.QMessageBox.StandardButton.Yes).click()
+
+
+def benchmark_size(size, actions, seed):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = load_app()
+    qt_app = app.QApplication.instance() or app.QApplication([])
+    qt_app.setStyleSheet(app.THEME_STYLESHEET)
+    working_directory = os.getcwd()
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            db = app.DatabaseManager()
+            setup_s, _ = timed(fill_database, db, size, seed)
+            db.close()
+
+            window, probe, first_paint = measure_first_paint(app, qt_app)
+            probe.settle()
+            results["first_paint"] = summarize([first_paint])
+            results["refresh"] = measure_refresh(probe)
+            if size <= FULL_LOAD_LIMIT:
+                results["load_all_pages"] = measure_full_load(probe)
+            results["scroll"] = measure_scroll(probe)
+
+            results["complete_task"] = measure_action(probe, window.complete_task, None, actions)
+            results["edit_task"] = measure_action(probe, window.edit_task, lambda: accept_task_dialog(app), actions)
+            results["delete_task"] = measure_action(probe, window.delete_task, lambda: confirm_message_box(app),
+                                                    actions)
+            window.close()
+        finally:
+            os.chdir(working_directory)
+
+    return {"setup_s": round(setup_s, 3), "peak_rss_mb": peak_rss_mb(), "operations": results}
+
+
+def run(args):
+    report = new_report("gui", actions_per_size=args.actions, repeat=args.repeat)
+
+    for size in args.sizes:
+        print(f"{size} задач...", file=sys.stderr, flush=True)
+        runs = [run_worker(__file__, size, args.actions, args.seed) for _ in range(args.repeat)]
+        report["sizes"][str(size)] = merge_runs(runs)
+
+    write_report(report, args.output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки интерфейса на платформе Qt offscreen")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="замерить интерфейс и записать JSON")
+    run_parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    run_parser.add_argument("--actions", type=int, default=DEFAULT_ACTIONS)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                            help="сколько раз прогнать каждый размер; берётся медиана")
+    run_parser.add_argument("--output", help="по умолчанию benchmarks/results/gui-<коммит>.json")
+
+    add_compare_command(commands)
+
+    worker_parser = commands.add_parser("worker")
+    worker_parser.add_argument("size", type=int)
+    worker_parser.add_argument("actions", type=int)
+    worker_parser.add_argument("seed", type=int)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    elif args.command == "compare":
+        sys.exit(compare(args.base, args.new, args.threshold, args.min_delta_ms))
+    else:
+        print(json.dumps(benchmark_size(args.size, args.actions, args.seed)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from report import add_compare_command, compare, new_report, summarize, write_report
+from synthetic import ROOT_DIR, WORDS, fill_database
+from todo_core import DatabaseManager
+
+SERVER_PATH = os.path.join(ROOT_DIR, "todo_api.py")
+DEFAULT_SIZES = (10000, 100000)
+DEFAULT_DURATION = 10.0
+DEFAULT_CONNECTIONS = 32
+DEFAULT_PIPELINE = 4
+DEFAULT_PROCESSES = 2
+STREAM_REPEATS = 3
+REQUEST_MIX = (
+    ("get_task", 40),
+    ("list_page", 25),
+    ("search", 10),
+    ("create_task", 10),
+    ("update_task", 15),
+)
+
+
+def build_request(kind, rng, size):
+    if kind == "get_task":
+        return "GET", f"/tasks/{rng.randint(1, size)}", None
+    if kind == "list_page":
+        return "GET", f"/tasks?limit=50&after={rng.randint(1, size)}", None
+    if kind == "search":
+        return "GET", f"/search?q={rng.randint(0, size - 1)}&limit=20", None
+    if kind == "create_task":
+        return "POST", "/tasks", {"title": f"{rng.choice(WORDS)} {rng.choice(WORDS)}", "deadline": "01.01.2030 10:00"}
+    return "PATCH", f"/tasks/{rng.randint(1, size)}", {"completed": rng.random() < 0.5}
+
+
+def encode_request(method, path, body):
+    payload = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(payload)}\r\n\r\n"
+    return head.encode("utf-8") + payload
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ")[1])
+    headers = {name.strip().lower(): value.strip()
+               for name, _, value in (line.partition(":") for line in lines[1:] if line)}
+
+    if headers.get("transfer-encoding") == "chunked":
+        size = 0
+        while True:
+            length = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(length + 2)
+            size += length
+            if length == 0:
+                return status, size
+    length = int(headers.get("content-length", 0))
+    await reader.readexactly(length)
+    return status, length
+
+
+async def drive_connection(host, port, deadline, pipeline, rng, size, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    in_flight = asyncio.Queue()
+    slots = asyncio.Semaphore(pipeline)
+    kinds = [kind for kind, _ in REQUEST_MIX]
+    weights = [weight for _, weight in REQUEST_MIX]
+
+    async def send():
+        while time.perf_counter() < deadline:
+            await slots.acquire()
+            kind = rng.choices(kinds, weights)[0]
+            writer.write(encode_request(*build_request(kind, rng, size)))
+            await in_flight.put((kind, time.perf_counter()))
+            await writer.drain()
+        await in_flight.put(None)
+
+    async def receive():
+        while True:
+            item = await in_flight.get()
+            if item is None:
+                return
+            kind, started = item
+            status, _ = await read_response(reader)
+            latencies[kind].append(time.perf_counter() - started)
+            if status >= 400:
+                errors[kind] = errors.get(kind, 0) + 1
+            slots.release()
+
+    await asyncio.gather(send(), receive())
+    writer.close()
+
+
+async def measure_stream(host, port):
+    latencies = []
+    for _ in range(STREAM_REPEATS):
+        reader, writer = await asyncio.open_connection(host, port)
+        started = time.perf_counter()
+        writer.write(encode_request("GET", "/tasks", None))
+        await writer.drain()
+        status, size = await read_response(reader)
+        latencies.append((time.perf_counter() - started, size))
+        writer.close()
+    return latencies
+
+
+async def generate_load(address, duration, connections, pipeline, seed, size):
+    host, port = address.rsplit(":", 1)
+    latencies = {kind: [] for kind, _ in REQUEST_MIX}
+    errors = {}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        drive_connection(host, int(port), deadline, pipeline, random.Random(seed + number), size, latencies, errors)
+        for number in range(connections)
+    ))
+    return {"elapsed_s": time.perf_counter() - started, "latencies": latencies, "errors": errors}
+
+
+def start_server(db_name):
+    server = subprocess.Popen([sys.executable, SERVER_PATH, "--db", db_name, "--port", "0"],
+                              stderr=subprocess.PIPE, text=True)
+    line = server.stderr.readline()
+    if "http://" not in line:
+        server.kill()
+        raise RuntimeError(f"сервер не запустился: {line}{server.stderr.read()}")
+    return server, line.rsplit("http://", 1)[1].strip()
+
+
+def run_load(address, size, args):
+    workers = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), "worker", address, str(args.duration),
+                          str(max(1, args.connections // args.processes)), str(args.pipeline), str(args.seed + number * 1000),
+                          str(size)], stdout=subprocess.PIPE, text=True)
+        for number in range(args.processes)
+    ]
+    runs = [json.loads(worker.communicate()[0]) for worker in workers]
+
+    elapsed = max(run["elapsed_s"] for run in runs)
+    operations = {}
+    everything = []
+    for kind, _ in REQUEST_MIX:
+        latencies = [latency for run in runs for latency in run["latencies"][kind]]
+        everything += latencies
+        if latencies:
+            operations[kind] = summarize_load(latencies, elapsed, sum(run["errors"].get(kind, 0) for run in runs))
+    operations["all"] = summarize_load(everything, elapsed, sum(sum(run["errors"].values()) for run in runs))
+
+    streams = asyncio.run(measure_stream(*address.rsplit(":", 1)))
+    operations["stream_all"] = summarize([latency for latency, _ in streams], STREAM_REPEATS * size,
+                                         mb=round(streams[0][1] / 2 ** 20, 2))
+    return operations
+
+
+def summarize_load(latencies, elapsed, errors):
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=1000, method="inclusive")
+        p95, p999 = percentiles[949], percentiles[998]
+    else:
+        p95 = p999 = latencies[0]
+    return summarize(latencies, throughput=round(len(latencies) / elapsed, 1), p95_ms=round(p95 * 1000, 4),
+                     p999_ms=round(p999 * 1000, 4), max_ms=round(max(latencies) * 1000, 4), errors=errors)
+
+
+def benchmark_size(size, args):
+    with tempfile.TemporaryDirectory() as directory:
+        db_name = os.path.join(directory, "bench.db")
+        db = DatabaseManager(db_name)
+        started = time.perf_counter()
+        fill_database(db, size, args.seed)
+        setup_s = time.perf_counter() - started
+        db.close()
+
+        server, address = start_server(db_name)
+        try:
+            operations = run_load(address, size, args)
+        finally:
+            server.terminate()
+            server.wait()
+
+    return {"runs": 1, "setup_s": round(setup_s, 3), "peak_rss_mb": None, "operations": operations}
+
+
+def print_tail(report):
+    print(f"\n{'размер':>8} {'запрос':<14} {'в секунду':>10} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9} "
+          f"{'p99.9, мс':>10} {'макс, мс':>9} {'ошибок':>7}", file=sys.stderr)
+    for size, result in report["sizes"].items():
+        for name, metrics in result["operations"].items():
+            if "p95_ms" in metrics:
+                print(f"{size:>8} {name:<14} {metrics['throughput']:>10} {metrics['p50_ms']:>9} {metrics['p95_ms']:>9} "
+                      f"{metrics['p99_ms']:>9} {metrics['p999_ms']:>10} {metrics['max_ms']:>9} {metrics['errors']:>7}",
+                      file=sys.stderr)
+
+
+def run(args):
+    report = new_report("http_load", duration_s=args.duration, connections=args.connections,
+                        pipeline=args.pipeline, processes=args.processes)
+
+    if args.address:
+        print(f"нагрузка на {args.address}...", file=sys.stderr, flush=True)
+        operations = run_load(args.address, args.address_size, args)
+        report["sizes"][str(args.address_size)] = {"runs": 1, "setup_s": 0, "peak_rss_mb": None,
+                                                   "operations": operations}
+    else:
+        for size in args.sizes:
+            print(f"{size} задач...", file=sys.stderr, flush=True)
+            report["sizes"][str(size)] = benchmark_size(size, args)
+
+    write_report(report, args.output)
+    print_tail(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест todo_api: запросы в секунду и хвосты задержек")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="поднять сервер на синтетической базе и дать нагрузку")
+    run_parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    run_parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="секунд нагрузки на размер")
+    run_parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS)
+    run_parser.add_argument("--pipeline", type=int, default=DEFAULT_PIPELINE,
+                            help="сколько запросов держать в полёте на одном соединении")
+    run_parser.add_argument("--processes", type=int, default=DEFAULT_PROCESSES, help="процессов-клиентов")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--address", help="host:port уже запущенного сервера вместо своего")
+    run_parser.add_argument("--address-size", type=int, default=1000,
+                            help="id задач для запросов к --address берутся из 1..N")
+    run_parser.add_argument("--output", help="по умолчанию benchmarks/results/http_load-<коммит>.json")
+
+    add_compare_command(commands)
+
+    worker_parser = commands.add_parser("worker")
+    worker_parser.add_argument("address")
+    worker_parser.add_argument("duration", type=float)
+    worker_parser.add_argument("connections", type=int)
+    worker_parser.add_argument("pipeline", type=int)
+    worker_parser.add_argument("seed", type=int)
+    worker_parser.add_argument("size", type=int)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    elif args.command == "compare":
+        sys.exit(compare(args.base, args.new, args.threshold, args.min_delta_ms))
+    else:
+        print(json.dumps(asyncio.run(generate_load(args.address, args.duration, args.connections, args.pipeline,
+                                                   args.seed, args.size))))
+
+
+if __name__ == "__main__":
+    main()
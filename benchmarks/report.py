@@ -0,0 +1,175 @@
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_MIN_DELTA_MS = 0.5
+LATENCY_METRICS = ("p50_ms", "p99_ms", "max_stall_ms")
+HIGHER_IS_BETTER = ("throughput",)
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def summarize(latencies, items=None, **extra):
+    total = sum(latencies)
+    items = len(latencies) if items is None else items
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p99 = percentiles[49], percentiles[98]
+    else:
+        p50 = p99 = latencies[0]
+    return {
+        "count": len(latencies),
+        "items": items,
+        "total_s": round(total, 6),
+        "throughput": round(items / total, 1) if total else None,
+        "p50_ms": round(p50 * 1000, 4),
+        "p99_ms": round(p99 * 1000, 4),
+        **extra,
+    }
+
+
+def timed(call, *args):
+    start = time.perf_counter()
+    result = call(*args)
+    return time.perf_counter() - start, result
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(RESULTS_DIR),
+                              check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_worker(script, *args):
+    output = subprocess.run([sys.executable, os.path.abspath(script), "worker", *map(str, args)],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def merge_runs(runs):
+    operations = {}
+    for name, metrics in runs[0]["operations"].items():
+        operations[name] = {
+            key: statistics.median(run["operations"][name][key] for run in runs)
+            for key in metrics
+        }
+
+    peaks = [run["peak_rss_mb"] for run in runs if run["peak_rss_mb"] is not None]
+    return {
+        "runs": len(runs),
+        "setup_s": statistics.median(run["setup_s"] for run in runs),
+        "peak_rss_mb": round(max(peaks), 1) if peaks else None,
+        "operations": operations,
+    }
+
+
+def new_report(suite, **fields):
+    return {
+        "suite": suite,
+        "commit": git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        **fields,
+        "sizes": {},
+    }
+
+
+def write_report(report, output=None):
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{report['suite']}-{report['commit'] or 'unknown'}.json")
+
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"Результаты записаны в {output}", file=sys.stderr)
+
+    for size, result in report["sizes"].items():
+        print_table(size, result)
+
+
+def print_table(size, result):
+    print(f"\n{size} задач: подготовка {result['setup_s']} с, пиковый RSS {result['peak_rss_mb']} МБ",
+          file=sys.stderr)
+    print(f"{'операция':<24} {'в секунду':>12} {'p50, мс':>10} {'p99, мс':>10} {'зависание, мс':>14}",
+          file=sys.stderr)
+    for name, metrics in result["operations"].items():
+        print(f"{name:<24} {metrics['throughput']:>12} {metrics['p50_ms']:>10} {metrics['p99_ms']:>10} "
+              f"{metrics.get('max_stall_ms', ''):>14}", file=sys.stderr)
+
+
+def relative_change(name, base, new):
+    if base is None or new is None or base == 0:
+        return None
+    change = (new - base) / base
+    if name in HIGHER_IS_BETTER:
+        change = -change
+    return change
+
+
+def compare(base_path, new_path, threshold=DEFAULT_THRESHOLD, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    with open(base_path, encoding="utf-8") as file:
+        base = json.load(file)
+    with open(new_path, encoding="utf-8") as file:
+        new = json.load(file)
+
+    print(f"{base.get('commit')} -> {new.get('commit')}")
+    regressions = []
+    for size, new_result in new["sizes"].items():
+        base_result = base["sizes"].get(size)
+        if base_result is None:
+            continue
+
+        rows = [("peak_rss_mb", "peak_rss_mb", base_result["peak_rss_mb"], new_result["peak_rss_mb"])]
+        for operation, metrics in new_result["operations"].items():
+            base_metrics = base_result["operations"].get(operation)
+            if base_metrics is None:
+                continue
+            for name in HIGHER_IS_BETTER + LATENCY_METRICS:
+                if name in metrics and name in base_metrics:
+                    rows.append((f"{operation}.{name}", name, base_metrics[name], metrics[name]))
+
+        for label, name, base_value, new_value in rows:
+            change = relative_change(name, base_value, new_value)
+            if change is None:
+                continue
+            noise = name in LATENCY_METRICS and abs(new_value - base_value) < min_delta_ms
+            status = "РЕГРЕССИЯ" if change > threshold and not noise else ""
+            print(f"{size:>8} {label:<32} {base_value:>12} {new_value:>12} {change:>+8.1%} {status}")
+            if status:
+                regressions.append((size, label, change))
+
+    if regressions:
+        print(f"\nРегрессий больше {threshold:.0%}: {len(regressions)}")
+        return 1
+    print(f"\nРегрессий больше {threshold:.0%} нет")
+    return 0
+
+
+def add_compare_command(commands):
+    compare_parser = commands.add_parser("compare", help="сравнить два прогона")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    compare_parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                                help="изменения задержки меньше этого порога считаются шумом")
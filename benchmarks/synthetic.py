@@ -0,0 +1,46 @@
+import importlib.util
+import os
+import random
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT_DIR, "Проект 20.11.py")
+TAG_SETS = ((), (), ("работа",), ("дом",), ("работа", "срочно"))
+WORDS = ("купить", "позвонить", "отчёт", "встреча", "проект", "молоко", "письмо", "оплатить", "код", "врач")
+
+sys.path.insert(0, ROOT_DIR)
+
+from todo_core import IMPORT_BATCH_SIZE
+
+
+def load_app():
+    spec = importlib.util.spec_from_file_location("todo_app", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def generate_tasks(count, seed=0, now=None):
+    rng = random.Random(seed)
+    now = int(time.time()) if now is None else now
+    for number in range(count):
+        completed = number % 4 == 0
+        yield (f"{rng.choice(WORDS)} {rng.choice(WORDS)} {number}",
+               " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 12))),
+               now + rng.randint(-10 ** 6, 10 ** 7), now - rng.randint(0, 10 ** 6), int(completed),
+               now - rng.randint(0, 10 ** 6) if completed else None, TAG_SETS[number % len(TAG_SETS)])
+
+
+def fill_database(db, count, seed=0):
+    rows = []
+    for row in generate_tasks(count, seed):
+        rows.append(row)
+        if len(rows) == IMPORT_BATCH_SIZE:
+            db.bulk_insert_tasks(rows)
+            rows = []
+    if rows:
+        db.bulk_insert_tasks(rows)
+
+    while db.index_search_backlog(IMPORT_BATCH_SIZE):
+        pass
@@ -0,0 +1,63 @@
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from synthetic import fill_database
+from todo_core import DatabaseManager
+from todo_core.storage import TASK_COLUMNS
+
+
+def row_to_dict(row):
+    return {
+        'id': row[0],
+        'title': row[1],
+        'description': row[2],
+        'deadline': row[3],
+        'date_of_creation': row[4],
+        'completed': bool(row[5]),
+        'completed_at': row[6],
+        'image': row[7],
+        'tags': tuple(sorted(row[8].split('\x1f'))) if row[8] else (),
+        'overdue': False
+    }
+
+
+def measure(load):
+    gc.collect()
+    tracemalloc.start()
+    records = load()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return records, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Память под загруженные задачи: словари против записей Task")
+    parser.add_argument("counts", nargs="*", type=int, default=[100000, 1000000], help="сколько задач загрузить")
+    args = parser.parse_args()
+
+    print(f"{'задач':>9} {'dict, МБ':>10} {'Task, МБ':>10} {'Б/задачу dict':>14} {'Б/задачу Task':>14} "
+          f"{'экономия':>9}")
+
+    for count in args.counts:
+        with tempfile.TemporaryDirectory() as directory:
+            db = DatabaseManager(os.path.join(directory, "bench.db"))
+            fill_database(db, count)
+
+            query = f"SELECT {TASK_COLUMNS} FROM tasks ORDER BY completed, order_ts, id"
+            records, dict_size = measure(lambda: [row_to_dict(row) for row in db.conn.execute(query)])
+            del records
+            records, task_size = measure(db.get_all_tasks)
+            del records
+            db.close()
+
+        print(f"{count:>9} {dict_size / 2 ** 20:>10.1f} {task_size / 2 ** 20:>10.1f} {dict_size / count:>14.0f} "
+              f"{task_size / count:>14.0f} {1 - task_size / dict_size:>9.0%}")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
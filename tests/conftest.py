@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from todo_core import DatabaseManager, current_timestamp  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "todo_app.db"))
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def add_task(db):
+    now = current_timestamp()
+
+    def add(title, hours=1, tags=(), description=''):
+        return db.add_task({'title': title, 'description': description, 'deadline': now + hours * 60 * 60,
+                            'date_of_creation': now, 'tags': list(tags)})
+
+    return add
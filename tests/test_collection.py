@@ -0,0 +1,144 @@
+from todo_core import Task, TaskCollection, task_sort_key
+from todo_core.collection import LAYOUT_UPDATE_THRESHOLD
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    def before_change(self, change):
+        self.events.append(('before', change.kind, change.first, change.last, change.destination))
+
+    def after_change(self, change):
+        self.events.append(('after', change.kind, change.first, change.last, change.destination))
+
+    def kinds(self):
+        return [(kind, first, last, destination) for stage, kind, first, last, destination in self.events
+                if stage == 'after']
+
+
+def make_task(task_id, deadline, completed=False, completed_at=None):
+    return Task(task_id, f"задача {task_id}", '', deadline, 0, completed, completed_at)
+
+
+def make_collection(deadlines, has_more=False):
+    collection = TaskCollection([make_task(task_id, deadline) for task_id, deadline in enumerate(deadlines, 1)])
+    collection.has_more = has_more
+    recorder = Recorder()
+    collection.add_listener(recorder)
+    return collection, recorder
+
+
+def ids(collection):
+    return [task.id for task in collection]
+
+
+def assert_consistent(collection):
+    assert collection.keys == sorted(collection.keys)
+    assert collection.keys == [task_sort_key(task) for task in collection]
+    assert collection.by_id == {task.id: task for task in collection}
+
+
+def test_insert_places_task_in_sort_order():
+    collection, recorder = make_collection([10, 30])
+
+    assert collection.insert(make_task(3, 20)) == 1
+    assert ids(collection) == [1, 3, 2]
+    assert recorder.events == [('before', 'insert', 1, 1, None), ('after', 'insert', 1, 1, None)]
+    assert collection.version == 1
+    assert_consistent(collection)
+
+
+def test_insert_past_loaded_tail_is_skipped():
+    collection, recorder = make_collection([10, 20], has_more=True)
+
+    assert collection.insert(make_task(3, 30)) == -1
+    assert collection.insert(make_task(4, 15)) == 1
+    assert ids(collection) == [1, 4, 2]
+    assert recorder.kinds() == [('insert', 1, 1, None)]
+
+
+def test_update_moves_or_updates_in_place():
+    collection, recorder = make_collection([10, 20, 30])
+
+    assert collection.update(1, {'title': "новое"}) == 0
+    assert collection.update(1, {'completed': True, 'completed_at': 5}) == 2
+    assert ids(collection) == [2, 3, 1]
+    assert collection.get(1).title == "новое"
+    assert recorder.kinds() == [('update', 0, 0, None), ('move', 0, 0, 2)]
+    assert_consistent(collection)
+
+
+def test_update_and_remove_ignore_unknown_ids():
+    collection, recorder = make_collection([10, 20])
+
+    assert collection.update(99, {'title': "нет"}) == -1
+    assert collection.remove(99) is None
+    assert ids(collection) == [1, 2]
+    assert recorder.events == []
+
+
+def test_update_past_loaded_tail_removes_task():
+    collection, recorder = make_collection([10, 20, 30], has_more=True)
+
+    assert collection.update(1, {'deadline': 40}) == -1
+    assert ids(collection) == [2, 3]
+    assert recorder.kinds() == [('remove', 0, 0, None)]
+
+
+def test_remove_and_remove_where_group_ranges():
+    collection, recorder = make_collection([10, 20, 30, 40, 50])
+
+    assert collection.remove(3).id == 3
+    removed = collection.remove_where(lambda task: task.id in (1, 4, 5))
+
+    assert sorted(task.id for task in removed) == [1, 4, 5]
+    assert ids(collection) == [2]
+    assert recorder.kinds() == [('remove', 2, 2, None), ('remove', 2, 3, None), ('remove', 0, 0, None)]
+    assert_consistent(collection)
+
+
+def test_update_many_small_selection_moves_rows():
+    collection, recorder = make_collection([10, 20, 30])
+
+    collection.update_many([1, 2, 99], {'completed': True, 'completed_at': 5})
+
+    assert ids(collection) == [3, 1, 2]
+    assert [event[0] for event in recorder.kinds()] == ['move', 'move']
+    assert_consistent(collection)
+
+
+def test_update_many_large_batch_resets_layout():
+    count = LAYOUT_UPDATE_THRESHOLD * 2 + 2
+    collection, recorder = make_collection(range(count))
+
+    collection.update_many(range(1, count + 1, 2), {'completed': True, 'completed_at': 5})
+
+    assert recorder.kinds() == [('layout', 0, count - 1, None)]
+    assert ids(collection) == [*range(2, count + 1, 2), *range(1, count + 1, 2)]
+    assert_consistent(collection)
+
+
+def test_sync_and_apply_changes_follow_fresh_rows():
+    collection, recorder = make_collection([10, 20, 30], has_more=True)
+
+    collection.sync([make_task(2, 20), make_task(3, 5), make_task(4, 40)], has_more=True)
+    assert ids(collection) == [3, 2, 4]
+    assert collection.has_more
+    assert_consistent(collection)
+
+    collection.apply_changes([make_task(5, 1), make_task(4, 35), make_task(2, 20, True, 7)], [3])
+    assert ids(collection) == [5, 4]
+    assert collection.get(4).deadline == 35
+    assert collection.get(2) is None
+    assert_consistent(collection)
+
+
+def test_reset_replaces_everything():
+    collection, recorder = make_collection([10, 20])
+
+    collection.reset([make_task(7, 1)])
+
+    assert ids(collection) == [7]
+    assert not collection.has_more
+    assert recorder.kinds() == [('reset', 0, 1, None)]
@@ -0,0 +1,239 @@
+import sqlite3
+
+import pytest
+
+from todo_core import DatabaseManager, MigrationError, current_timestamp, parse_text_datetime, task_sort_key
+
+DAY = 24 * 60 * 60
+
+
+def create_baseline_database(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            deadline TEXT NOT NULL,
+            date_of_creation TEXT NOT NULL,
+            completed BOOLEAN DEFAULT 0,
+            completed_at TEXT
+        )
+    ''')
+    conn.executemany('''
+        INSERT INTO tasks (title, description, deadline, date_of_creation, completed, completed_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+
+
+def task_ids(tasks):
+    return [task.id for task in tasks]
+
+
+def test_migrates_baseline_text_dates(tmp_path):
+    path = str(tmp_path / "todo_app.db")
+    create_baseline_database(path, [
+        ("Отчёт", "квартальный", "20.11.2025 10:00", "01.11.2025 09:30", 0, None),
+        ("Молоко", "", "05.11.2025 18:00", "01.11.2025 09:45", 1, "04.11.2025 12:15"),
+    ])
+
+    db = DatabaseManager(path)
+    try:
+        assert db.conn.execute('PRAGMA user_version').fetchone()[0] == len(db.schema_migrations())
+        columns = {row[1] for row in db.conn.execute('PRAGMA table_info(tasks)')}
+        assert not columns & {'deadline', 'date_of_creation', 'completed_at'}
+
+        report, milk = db.get_all_tasks()
+        assert (report.title, report.completed) == ("Отчёт", False)
+        assert report.deadline == parse_text_datetime("20.11.2025 10:00")
+        assert report.date_of_creation == parse_text_datetime("01.11.2025 09:30")
+        assert (milk.title, milk.completed) == ("Молоко", True)
+        assert milk.completed_at == parse_text_datetime("04.11.2025 12:15")
+        assert task_ids(db.search("отчёт")) == [report.id]
+    finally:
+        db.close()
+
+
+def test_unparseable_legacy_dates_leave_database_untouched(tmp_path):
+    path = str(tmp_path / "todo_app.db")
+    create_baseline_database(path, [
+        ("Хорошая", "", "20.11.2025 10:00", "01.11.2025 09:30", 0, None),
+        ("Плохая", "", "завтра", "01.11.2025 09:30", 0, None),
+    ])
+
+    with pytest.raises(MigrationError, match="2"):
+        DatabaseManager(path)
+
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == 0
+        assert conn.execute('SELECT deadline FROM tasks ORDER BY id').fetchall() == [("20.11.2025 10:00",),
+                                                                                     ("завтра",)]
+        conn.execute("UPDATE tasks SET deadline = '21.11.2025 10:00' WHERE id = 2")
+        conn.commit()
+    finally:
+        conn.close()
+
+    db = DatabaseManager(path)
+    try:
+        assert db.get_tasks_by_ids([2])[0].deadline == parse_text_datetime("21.11.2025 10:00")
+    finally:
+        db.close()
+
+
+def test_reopening_skips_migrations(db):
+    version = db.conn.execute('PRAGMA user_version').fetchone()[0]
+    reopened = DatabaseManager(db.db_name)
+    try:
+        assert reopened.conn.execute('PRAGMA user_version').fetchone()[0] == version
+    finally:
+        reopened.close()
+
+
+def test_tasks_page_walks_keyset_in_list_order(db, add_task):
+    ids = [add_task(f"задача {hours}", hours) for hours in (5, 1, 4, 2, 3)]
+    db.bulk_complete([ids[1]])
+
+    pages = []
+    after_key = None
+    while True:
+        page = db.get_tasks_page(after_key, 2)
+        if not page:
+            break
+        pages.append(task_ids(page))
+        after_key = task_sort_key(page[-1])
+
+    assert pages == [[ids[3], ids[4]], [ids[2], ids[0]], [ids[1]]]
+    assert sum(pages, []) == task_ids(db.get_all_tasks())
+
+
+def test_tag_filters_combine_all_any_and_none(db, add_task):
+    home = add_task("дом", 1, ["дом"])
+    both = add_task("оба", 2, ["дом", "работа"])
+    work = add_task("работа", 3, ["работа"])
+    untagged = add_task("без тегов", 4)
+
+    assert task_ids(db.get_tasks_by_tags(all_of=["дом", "работа"])) == [both]
+    assert task_ids(db.get_tasks_by_tags(any_of=["дом", "работа"])) == [home, both, work]
+    assert task_ids(db.get_tasks_by_tags(none_of=["дом"])) == [work, untagged]
+    assert task_ids(db.get_tasks_by_tags(all_of=["работа"], none_of=["дом"])) == [work]
+    assert task_ids(db.get_tasks_by_tags(all_of=["дом", "нет такого"])) == []
+    assert dict(db.get_tags()) == {"дом": 2, "работа": 2}
+
+
+def test_changes_since_reports_updates_and_removals(db, add_task):
+    kept = add_task("останется", 1, ["дом"])
+    removed = add_task("удалится", 2)
+    version = db.change_version()
+
+    added = add_task("новая", 3, ["дом"])
+    db.update_task(kept, {'title': "переименована", 'description': '', 'deadline': current_timestamp() + DAY,
+                          'date_of_creation': current_timestamp()})
+    db.delete_task(removed)
+
+    changes = db.changes_since(version)
+    assert changes.version == db.change_version() > version
+    assert sorted(task_ids(changes.tasks)) == sorted([kept, added])
+    assert changes.removed_ids == [removed]
+    assert db.get_tasks_by_ids([kept])[0].title == "переименована"
+    assert db.changes_since(changes.version) == (changes.version, [], [])
+
+    untagged = add_task("без тега", 4)
+    filtered = db.changes_since(changes.version, ["дом"])
+    assert filtered.tasks == [] and filtered.removed_ids == [untagged]
+
+
+def test_changes_since_asks_for_reload_when_journal_is_short(db, add_task):
+    version = db.change_version()
+    add_task("первая")
+    add_task("вторая")
+
+    assert db.changes_since(version, limit=1) is None
+
+    db.compact_changes(keep=1)
+    assert db.changes_since(version) is None
+    assert db.changes_since(db.change_version() - 1) is not None
+
+
+def test_archive_and_restore(db, add_task):
+    old = add_task("старая", 1, ["дом"], "молоко")
+    recent = add_task("свежая", 2, description="молоко")
+    active = add_task("активная", 3, description="молоко")
+    db.bulk_complete([old], current_timestamp() - 40 * DAY)
+    db.bulk_complete([recent])
+
+    db.set_archive_after_days(30)
+    assert db.archive_due_tasks() == 1
+    assert db.archive_due_tasks() == 0
+    assert task_ids(db.get_all_tasks()) == [active, recent]
+    assert (db.count_tasks(), db.count_tasks(archived=True)) == (2, 1)
+    assert db.get_tags() == []
+
+    assert sorted(task_ids(db.search("молоко"))) == [recent, active]
+    found = {task.id: task.archived for task in db.search("молоко", include_archive=True)}
+    assert found == {old: True, recent: False, active: False}
+
+    assert db.restore_archived_tasks([old, 999]) == [old]
+    restored = db.get_tasks_by_ids([old])[0]
+    assert (restored.completed, restored.tags, restored.archived) == (True, ("дом",), False)
+    assert db.count_tasks(archived=True) == 0
+
+
+def test_archive_is_off_by_default(db, add_task):
+    task_id = add_task("старая")
+    db.bulk_complete([task_id], current_timestamp() - 400 * DAY)
+
+    assert db.get_archive_after_days() == 0
+    assert db.archive_due_tasks() == 0
+    db.set_archive_after_days(365)
+    assert db.archive_due_tasks() == 1
+
+
+def test_update_of_missing_task_changes_nothing(db, add_task):
+    task_id = add_task("есть", tags=["дом"])
+
+    assert not db.update_task(task_id + 1, {'title': "нет", 'description': '', 'deadline': 0,
+                                            'date_of_creation': 0, 'tags': ["дом"]})
+    assert dict(db.get_tags()) == {"дом": 1}
+
+
+def test_tags_differing_in_case_are_one_tag(db, add_task):
+    first = add_task("первая", 1, ["Дом"])
+    second = add_task("вторая", 2, ["дом", "ДОМ"])
+    db.bulk_insert_tasks([("третья", '', current_timestamp(), current_timestamp(), 0, None, ("дОм",))])
+
+    assert db.get_tags() == [("Дом", 3)]
+    assert db.get_tasks_by_ids([second])[0].tags == ("Дом",)
+    assert len(db.get_tasks_by_tags(all_of=["ДОМ"])) == 3
+    assert task_ids(db.get_tasks_by_tags(none_of=["дом"])) == []
+    assert first in task_ids(db.get_tasks_by_tags(any_of=["дом", "работа"]))
+
+
+def test_tag_key_migration_merges_case_duplicates(db, add_task):
+    first = add_task("первая", 1, ["Дом"])
+    second = add_task("вторая", 2)
+    db.conn.execute('DROP INDEX idx_tags_key')
+    db.conn.execute("INSERT INTO tags (name) VALUES ('дом')")
+    db.conn.execute("INSERT INTO task_tags (task_id, tag_id) SELECT ?, id FROM tags WHERE name = 'дом'", (second,))
+    db.conn.execute("UPDATE tags SET key = ''")
+    db.conn.execute(f'PRAGMA user_version = {len(db.schema_migrations()) - 1}')
+    db.close()
+
+    reopened = DatabaseManager(db.db_name)
+    try:
+        assert reopened.get_tags() == [("Дом", 2)]
+        assert task_ids(reopened.get_tasks_by_tags(all_of=["дом"])) == [first, second]
+    finally:
+        reopened.close()
+
+
+def test_bulk_operations_report_affected_rows(db, add_task):
+    first = add_task("первая")
+    second = add_task("вторая")
+
+    assert db.bulk_complete([first, second, 999]) == 2
+    assert db.bulk_uncomplete([second, 999]) == 1
+    assert db.bulk_delete([first, 999]) == 1
+    assert db.bulk_delete([999]) == 0
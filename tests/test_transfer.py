@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+from todo_core import export_tasks, import_tasks, parse_text_datetime, validate_import_record
+
+NOW = 1700000000
+
+
+def valid_record(**fields):
+    return {'title': "Купить молоко", 'deadline': "20.11.2025 10:00", **fields}
+
+
+def test_validate_import_record_accepts_minimal_record():
+    row, error = validate_import_record(valid_record(tags="дом, , работа"), NOW)
+
+    assert error is None
+    assert row == ("Купить молоко", '', parse_text_datetime("20.11.2025 10:00"), NOW, 0, None, ("дом", "работа"))
+
+
+def test_validate_import_record_fills_completed_at():
+    row, error = validate_import_record(valid_record(completed="да"), NOW)
+    assert error is None and row[4:6] == (1, NOW)
+
+    row, error = validate_import_record(valid_record(completed=True, completed_at="19.11.2025 08:00"), NOW)
+    assert error is None and row[5] == parse_text_datetime("19.11.2025 08:00")
+
+
+@pytest.mark.parametrize('record, message', [
+    (valid_record(title="   "), "пустое название"),
+    (valid_record(title=5), "title должен быть строкой"),
+    (valid_record(description=["a"]), "description должен быть строкой"),
+    (valid_record(deadline=20251120), "deadline должен быть строкой"),
+    (valid_record(deadline="31.02.2025 10:00"), "некорректный дедлайн"),
+    (valid_record(date_of_creation="вчера"), "некорректная дата создания"),
+    (valid_record(completed=True, completed_at="потом"), "некорректная дата выполнения"),
+    (valid_record(tags=[1, 2]), "tags должен быть строкой или списком строк"),
+    (valid_record(tags={'дом': 1}), "tags должен быть строкой или списком строк"),
+])
+def test_validate_import_record_rejects_bad_fields(record, message):
+    row, error = validate_import_record(record, NOW)
+
+    assert row is None
+    assert error.startswith(message)
+
+
+def test_import_jsonl_reports_rejected_lines(db, tmp_path):
+    path = tmp_path / "tasks.jsonl"
+    lines = [
+        json.dumps(valid_record(tags=["дом"]), ensure_ascii=False),
+        "",
+        "{не json",
+        json.dumps(["список"]),
+        json.dumps(valid_record(title=None)),
+        json.dumps(valid_record(title="Вторая", completed=True), ensure_ascii=False),
+    ]
+    path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+
+    result = import_tasks(db, str(path))
+
+    assert result.imported == 2
+    assert result.rejected_count == 3
+    assert [line for line, error in result.rejected] == [3, 4, 5]
+    assert [(task.title, task.completed, task.tags) for task in db.get_all_tasks()] == [
+        ("Купить молоко", False, ("дом",)), ("Вторая", True, ())
+    ]
+    assert db.index_search_backlog() == 2
+    assert [task.title for task in db.search("молоко")] == ["Купить молоко"]
+
+
+@pytest.mark.parametrize('name', ["tasks.csv", "tasks.jsonl"])
+def test_export_import_round_trip(db, add_task, tmp_path, name):
+    from todo_core import DatabaseManager
+
+    add_task("Отчёт", 2, ["работа"], "квартальный")
+    done = add_task("Молоко", 1, ["дом", "магазин"])
+    db.bulk_complete([done])
+    path = str(tmp_path / name)
+
+    assert export_tasks(db, path) == 2
+
+    copy = DatabaseManager(str(tmp_path / "copy.db"))
+    try:
+        assert import_tasks(copy, path).imported == 2
+
+        def fields(task):
+            return task.title, task.description, task.completed, task.tags, task.deadline // 60
+
+        assert sorted(map(fields, copy.get_all_tasks())) == sorted(map(fields, db.get_all_tasks()))
+    finally:
+        copy.close()
+
+
+def test_cancelled_import_keeps_committed_batches(db, tmp_path, monkeypatch):
+    from todo_core import transfer
+
+    monkeypatch.setattr(transfer, 'IMPORT_BATCH_SIZE', 500)
+    path = tmp_path / "tasks.jsonl"
+    line = json.dumps(valid_record(), ensure_ascii=False)
+    path.write_text("\n".join([line] * 3000) + "\n", encoding='utf-8')
+
+    checks = []
+    result = import_tasks(db, str(path), is_cancelled=lambda: checks.append(1) or len(checks) == 2)
+
+    assert result.cancelled
+    assert result.imported == db.count_tasks() == 1500
+    assert len(checks) == 2
+
+
+def test_export_can_include_archive(db, add_task, tmp_path):
+    from todo_core import current_timestamp
+
+    add_task("текущая")
+    old = add_task("старая")
+    db.bulk_complete([old], current_timestamp() - 40 * 24 * 60 * 60)
+    db.set_archive_after_days(30)
+    db.archive_due_tasks()
+    path = tmp_path / "tasks.jsonl"
+
+    assert export_tasks(db, str(path)) == 1
+    assert export_tasks(db, str(path), include_archive=True) == 2
+    titles = [json.loads(line)['title'] for line in path.read_text(encoding='utf-8').splitlines()]
+    assert titles == ["текущая", "старая"]
@@ -0,0 +1,232 @@
+import argparse
+import os
+import sqlite3
+import sys
+
+from todo_core import (DatabaseManager, current_timestamp, export_record, export_tasks, format_export_timestamp,
+                       is_overdue, parse_text_datetime, tag_filter_conditions, task_sort_key)
+
+DEFAULT_DB_NAME = "todo_app.db"
+LIST_PAGE_SIZE = 1000
+SEARCH_LIMIT = 100
+
+
+def format_task(task, now):
+    if task.completed:
+        status = "x"
+    elif is_overdue(task, now):
+        status = "!"
+    else:
+        status = " "
+    tags = "".join(f" #{tag}" for tag in task.tags)
+    archived = " (в архиве)" if task.archived else ""
+    return f"{task.id:>7} [{status}] {format_export_timestamp(task.deadline)}  {task.title}{tags}{archived}\n"
+
+
+def write_tasks(tasks, args):
+    if args.json:
+        import json
+
+        lines = [json.dumps(export_record(task), ensure_ascii=False) + "\n" for task in tasks]
+    else:
+        now = current_timestamp()
+        lines = [format_task(task, now) for task in tasks]
+    sys.stdout.writelines(lines)
+    sys.stdout.flush()
+
+
+def write_result(args, text, **result):
+    if args.json:
+        import json
+
+        print(json.dumps(result, ensure_ascii=False))
+    elif text:
+        print(text)
+
+
+def require_tasks(db, task_ids):
+    found = {task.id for task in db.get_tasks_by_ids(task_ids)}
+    missing = [task_id for task_id in task_ids if task_id not in found]
+    if missing:
+        raise LookupError(f"задачи не найдены: {', '.join(map(str, missing))}")
+
+
+def add(db, args):
+    deadline = parse_text_datetime(args.deadline)
+    if deadline is None:
+        raise ValueError(f"некорректный дедлайн: {args.deadline!r}, ожидается ДД.ММ.ГГГГ ЧЧ:ММ")
+
+    title = args.title.strip()
+    if not title:
+        raise ValueError("пустое название")
+
+    task_id = db.add_task({
+        'title': title,
+        'description': args.description.strip(),
+        'deadline': deadline,
+        'date_of_creation': current_timestamp(),
+        'tags': [tag.strip() for tag in args.tag if tag.strip()]
+    })
+    write_result(args, str(task_id), id=task_id)
+
+
+def list_tasks(db, args):
+    conditions, params = tag_filter_conditions(all_of=args.tag)
+    if args.active:
+        conditions.append('completed = 0')
+    elif args.completed:
+        conditions.append('completed = 1')
+
+    remaining = args.limit
+    after_key = None
+    while remaining is None or remaining > 0:
+        limit = LIST_PAGE_SIZE if remaining is None else min(LIST_PAGE_SIZE, remaining)
+        tasks = db.select_tasks_page(conditions, params, after_key, limit)
+        if not tasks:
+            break
+
+        write_tasks(tasks, args)
+        if len(tasks) < limit:
+            break
+        after_key = task_sort_key(tasks[-1])
+        if remaining is not None:
+            remaining -= len(tasks)
+
+
+def complete(db, args):
+    require_tasks(db, args.ids)
+    completed_at = current_timestamp()
+    db.bulk_complete(args.ids, completed_at)
+    write_result(args, None, completed=args.ids, completed_at=format_export_timestamp(completed_at))
+
+
+def uncomplete(db, args):
+    require_tasks(db, args.ids)
+    db.bulk_uncomplete(args.ids)
+    write_result(args, None, uncompleted=args.ids)
+
+
+def delete(db, args):
+    require_tasks(db, args.ids)
+    db.bulk_delete(args.ids)
+    write_result(args, None, deleted=args.ids)
+
+
+def clear_completed(db, args):
+    with db.transaction():
+        count = db.conn.execute('SELECT COUNT(*) FROM tasks WHERE completed = 1').fetchone()[0]
+        db.clear_completed_tasks()
+    write_result(args, f"Удалено выполненных задач: {count}", deleted=count)
+
+
+def archive(db, args):
+    days = db.get_archive_after_days() if args.days is None else args.days
+    if days < 0:
+        raise ValueError("число дней не может быть отрицательным")
+
+    archived = 0
+    if days:
+        completed_before = current_timestamp() - days * 24 * 60 * 60
+        while True:
+            moved = db.archive_completed_tasks(completed_before)
+            if not moved:
+                break
+            archived += moved
+    write_result(args, f"Перенесено в архив: {archived}", archived=archived)
+
+
+def unarchive(db, args):
+    with db.transaction():
+        restored = db.restore_archived_tasks(args.ids)
+        missing = [task_id for task_id in args.ids if task_id not in restored]
+        if missing:
+            raise LookupError(f"задачи не найдены в архиве: {', '.join(map(str, missing))}")
+    write_result(args, None, restored=restored)
+
+
+def search(db, args):
+    write_tasks(db.search(args.query, args.limit, args.archive), args)
+
+
+def export(db, args):
+    exported = export_tasks(db, args.path, archived=args.archive)
+    write_result(args, f"Экспортировано задач: {exported}", exported=exported, path=args.path)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="todo", description="Задачи из todo_app.db без запуска интерфейса")
+    parser.add_argument("--db", default=DEFAULT_DB_NAME, help=f"файл базы, по умолчанию {DEFAULT_DB_NAME}")
+    parser.add_argument("--json", action="store_true", help="выводить JSON, по одному объекту в строке")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add_parser = commands.add_parser("add", help="создать задачу и вывести её id")
+    add_parser.add_argument("title")
+    add_parser.add_argument("--deadline", required=True, help="ДД.ММ.ГГГГ ЧЧ:ММ")
+    add_parser.add_argument("--description", default="")
+    add_parser.add_argument("--tag", action="append", default=[], help="можно указать несколько раз")
+    add_parser.set_defaults(handler=add)
+
+    list_parser = commands.add_parser("list", help="вывести задачи в порядке списка приложения")
+    status = list_parser.add_mutually_exclusive_group()
+    status.add_argument("--active", action="store_true", help="только невыполненные")
+    status.add_argument("--completed", action="store_true", help="только выполненные")
+    list_parser.add_argument("--tag", action="append", default=[], help="задачи со всеми указанными тегами")
+    list_parser.add_argument("--limit", type=int)
+    list_parser.set_defaults(handler=list_tasks)
+
+    for name, handler, help_text in (("complete", complete, "отметить задачи выполненными"),
+                                     ("uncomplete", uncomplete, "вернуть задачи в работу"),
+                                     ("delete", delete, "удалить задачи")):
+        ids_parser = commands.add_parser(name, help=help_text)
+        ids_parser.add_argument("ids", nargs="+", type=int, metavar="id")
+        ids_parser.set_defaults(handler=handler)
+
+    clear_parser = commands.add_parser("clear-completed", help="удалить все выполненные задачи")
+    clear_parser.set_defaults(handler=clear_completed)
+
+    search_parser = commands.add_parser("search", help="полнотекстовый поиск по названию и описанию")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=SEARCH_LIMIT)
+    search_parser.add_argument("--archive", action="store_true", help="искать и среди задач в архиве")
+    search_parser.set_defaults(handler=search)
+
+    export_parser = commands.add_parser("export", help="выгрузить все задачи в CSV или, для .jsonl, в JSON Lines")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--archive", action="store_true", help="выгрузить задачи из архива вместо текущих")
+    export_parser.set_defaults(handler=export)
+
+    archive_parser = commands.add_parser("archive", help="перенести в архив давно выполненные задачи")
+    archive_parser.add_argument("--days", type=int,
+                                help="выполненные раньше, чем столько дней назад; по умолчанию из настроек приложения")
+    archive_parser.set_defaults(handler=archive)
+
+    unarchive_parser = commands.add_parser("unarchive", help="вернуть задачи из архива в список")
+    unarchive_parser.add_argument("ids", nargs="+", type=int, metavar="id")
+    unarchive_parser.set_defaults(handler=unarchive)
+
+    return parser
+
+
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+
+    db = None
+    try:
+        db = DatabaseManager(args.db)
+        args.handler(db, args)
+    except BrokenPipeError:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (LookupError, ValueError, OSError, sqlite3.Error) as error:
+        print(f"todo: {error}", file=sys.stderr)
+        return 1
+    finally:
+        if db is not None:
+            db.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
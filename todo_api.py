@@ -0,0 +1,583 @@
+import argparse
+import asyncio
+import json
+import sqlite3
+import sys
+import threading
+import traceback
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from todo_core import (DatabaseManager, current_timestamp, export_record, parse_text_datetime, tag_filter_conditions,
+                       task_sort_key, validate_import_record)
+
+DEFAULT_DB_NAME = "todo_app.db"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_READERS = 4
+MAX_PENDING_QUERIES = 256
+PIPELINE_DEPTH = 32
+MAX_HEADER_SIZE = 64 * 1024
+MAX_BODY_SIZE = 16 * 1024 * 1024
+STREAM_PAGE_SIZE = 1000
+SEARCH_LIMIT = 100
+MAINTENANCE_INTERVAL = 10 * 60
+REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    410: "Gone",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+Request = namedtuple('Request', ['method', 'path', 'query', 'body', 'version', 'keep_alive'])
+Response = namedtuple('Response', ['status', 'body', 'chunks'])
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def json_bytes(value):
+    return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+
+def json_response(value, status=200):
+    return Response(status, json_bytes(value), None)
+
+
+def error_response(status, message):
+    return json_response({'error': message}, status)
+
+
+def parse_body(request):
+    try:
+        value = json.loads(request.body or b'null')
+    except ValueError as error:
+        raise HttpError(400, f"некорректный JSON: {error}") from None
+    if not isinstance(value, dict):
+        raise HttpError(400, "ожидался JSON-объект")
+    return value
+
+
+def parse_int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HttpError(400, f"{name} должен быть целым числом") from None
+
+
+def parse_limit(value):
+    limit = parse_int(value, 'limit')
+    if limit <= 0:
+        raise HttpError(400, "limit должен быть больше нуля")
+    return limit
+
+
+def parse_ids(value, name):
+    if not isinstance(value, list) or \
+            not all(isinstance(task_id, int) and not isinstance(task_id, bool) for task_id in value):
+        raise HttpError(400, f"{name} должен быть списком id")
+    return value
+
+
+def parse_record(record, now):
+    if not isinstance(record, dict):
+        return None, "ожидался JSON-объект"
+    return validate_import_record(record, now)
+
+
+def fetch_task(db, task_id):
+    tasks = db.get_tasks_by_ids([task_id])
+    return export_record(tasks[0]) if tasks else None
+
+
+def fetch_page(db, conditions, params, after_key, limit):
+    tasks = db.select_tasks_page(conditions, params, after_key, limit)
+    body = b','.join(json_bytes(export_record(task)) for task in tasks)
+    return body, len(tasks), task_sort_key(tasks[-1]) if tasks else None
+
+
+def fetch_sort_key(db, task_id):
+    tasks = db.get_tasks_by_ids([task_id])
+    return task_sort_key(tasks[0]) if tasks else None
+
+
+def fetch_changes(db, version, all_of):
+    changes = db.changes_since(version, all_of)
+    if changes is None:
+        return None
+    return {'version': changes.version, 'tasks': [export_record(task) for task in changes.tasks],
+            'removed': changes.removed_ids}
+
+
+def search_tasks(db, query, limit, include_archive):
+    return [{**export_record(task), 'archived': task.archived} for task in db.search(query, limit, include_archive)]
+
+
+def create_task(db, row):
+    title, description, deadline, date_of_creation, completed, completed_at, tags = row
+    with db.transaction():
+        task_id = db.add_task({'title': title, 'description': description, 'deadline': deadline,
+                               'date_of_creation': date_of_creation, 'tags': tags})
+        if completed:
+            db.bulk_complete([task_id], completed_at)
+    return fetch_task(db, task_id)
+
+
+def update_task(db, task_id, changes):
+    with db.transaction():
+        tasks = db.get_tasks_by_ids([task_id])
+        if not tasks:
+            return None
+        task_data = tasks[0]
+
+        if changes.keys() - {'completed'}:
+            db.update_task(task_id, {
+                'title': changes.get('title', task_data.title),
+                'description': changes.get('description', task_data.description),
+                'deadline': changes.get('deadline', task_data.deadline),
+                'date_of_creation': task_data.date_of_creation,
+                'image': task_data.image,
+                'tags': changes.get('tags', task_data.tags)
+            })
+
+        if 'completed' in changes and changes['completed'] != task_data.completed:
+            if changes['completed']:
+                db.complete_task(task_id)
+            else:
+                db.uncomplete_task(task_id)
+
+    return fetch_task(db, task_id)
+
+
+def delete_task(db, task_id):
+    with db.transaction():
+        if not db.get_tasks_by_ids([task_id]):
+            return False
+        db.delete_task(task_id)
+    return True
+
+
+def apply_bulk(db, rows, complete_ids, uncomplete_ids, delete_ids):
+    with db.transaction():
+        created = db.bulk_insert_tasks(rows) if rows else 0
+        completed = db.bulk_complete(complete_ids) if complete_ids else 0
+        uncompleted = db.bulk_uncomplete(uncomplete_ids) if uncomplete_ids else 0
+        deleted = db.bulk_delete(delete_ids) if delete_ids else 0
+
+    while db.index_search_backlog():
+        pass
+
+    return {'created': created, 'completed': completed, 'uncompleted': uncompleted, 'deleted': deleted}
+
+
+class TaskStore:
+    def __init__(self, db_name, readers):
+        self.db_name = db_name
+        self.local = threading.local()
+        self.writer = ThreadPoolExecutor(1, thread_name_prefix='todo-writer')
+        self.readers = ThreadPoolExecutor(readers, thread_name_prefix='todo-reader')
+        self.reader_count = readers
+        self.pending = asyncio.Semaphore(MAX_PENDING_QUERIES)
+
+    def run(self, function, args):
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            db = self.local.db = DatabaseManager(self.db_name)
+        return function(db, *args)
+
+    async def submit(self, executor, function, args):
+        async with self.pending:
+            return await asyncio.get_running_loop().run_in_executor(executor, self.run, function, args)
+
+    async def read(self, function, *args):
+        return await self.submit(self.readers, function, args)
+
+    async def write(self, function, *args):
+        return await self.submit(self.writer, function, args)
+
+    def close_database(self):
+        db = getattr(self.local, 'db', None)
+        if db is not None:
+            db.close()
+            self.local.db = None
+
+    def close_reader_database(self, barrier):
+        barrier.wait()
+        self.close_database()
+
+    def close(self):
+        barrier = threading.Barrier(self.reader_count)
+        closing = [self.readers.submit(self.close_reader_database, barrier) for _ in range(self.reader_count)]
+        for future in closing:
+            future.result()
+        self.readers.shutdown()
+        self.writer.submit(self.close_database).result()
+        self.writer.shutdown()
+
+
+class TaskApi:
+    def __init__(self, store):
+        self.store = store
+
+    async def handle(self, request):
+        parts = request.path.strip('/').split('/')
+
+        if parts == ['tasks']:
+            routes = {'GET': self.list_tasks, 'POST': self.create_task}
+        elif parts == ['tasks', 'bulk']:
+            routes = {'POST': self.bulk}
+        elif len(parts) == 2 and parts[0] == 'tasks':
+            if not parts[1].isdigit():
+                raise HttpError(404, "задача не найдена")
+            task_id = int(parts[1])
+            routes = {
+                'GET': lambda request: self.get_task(task_id),
+                'PATCH': lambda request: self.update_task(task_id, request),
+                'DELETE': lambda request: self.delete_task(task_id)
+            }
+        elif parts == ['changes']:
+            routes = {'GET': self.changes}
+        elif parts == ['search']:
+            routes = {'GET': self.search}
+        elif parts == ['tags']:
+            routes = {'GET': self.tags}
+        else:
+            raise HttpError(404, f"неизвестный адрес: {request.path}")
+
+        handler = routes.get(request.method)
+        if handler is None:
+            raise HttpError(405, f"метод {request.method} не поддерживается для {request.path}")
+        return await handler(request)
+
+    async def list_tasks(self, request):
+        conditions, params = tag_filter_conditions(all_of=request.query.get('tag', ()))
+        status = request.query.get('status', [None])[-1]
+        if status == 'active':
+            conditions.append('completed = 0')
+        elif status == 'completed':
+            conditions.append('completed = 1')
+        elif status is not None:
+            raise HttpError(400, "status должен быть active или completed")
+
+        limit = None
+        if 'limit' in request.query:
+            limit = parse_limit(request.query['limit'][-1])
+
+        after_key = None
+        if 'after' in request.query:
+            after_key = await self.store.read(fetch_sort_key, parse_int(request.query['after'][-1], 'after'))
+            if after_key is None:
+                raise HttpError(404, "задача из after не найдена")
+
+        return Response(200, None, self.stream_tasks(conditions, params, after_key, limit))
+
+    async def stream_tasks(self, conditions, params, after_key, remaining):
+        separator = b'['
+        while remaining is None or remaining > 0:
+            limit = STREAM_PAGE_SIZE if remaining is None else min(STREAM_PAGE_SIZE, remaining)
+            body, count, after_key = await self.store.read(fetch_page, conditions, params, after_key, limit)
+            if count:
+                yield separator + body
+                separator = b','
+            if count < limit:
+                break
+            if remaining is not None:
+                remaining -= count
+        yield b']' if separator == b',' else b'[]'
+
+    async def get_task(self, task_id):
+        task_data = await self.store.read(fetch_task, task_id)
+        if task_data is None:
+            raise HttpError(404, "задача не найдена")
+        return json_response(task_data)
+
+    async def create_task(self, request):
+        row, error = parse_record(parse_body(request), current_timestamp())
+        if error is not None:
+            raise HttpError(400, error)
+        return json_response(await self.store.write(create_task, row), 201)
+
+    async def update_task(self, task_id, request):
+        body = parse_body(request)
+        changes = {}
+        for field in ('title', 'description'):
+            if field in body:
+                if not isinstance(body[field], str):
+                    raise HttpError(400, f"{field} должен быть строкой")
+                changes[field] = body[field].strip()
+        if 'title' in changes and not changes['title']:
+            raise HttpError(400, "пустое название")
+        if 'deadline' in body:
+            if not isinstance(body['deadline'], str):
+                raise HttpError(400, "deadline должен быть строкой")
+            changes['deadline'] = parse_text_datetime(body['deadline'])
+            if changes['deadline'] is None:
+                raise HttpError(400, f"некорректный дедлайн: {body['deadline']!r}")
+        if 'tags' in body:
+            if not (isinstance(body['tags'], list) and all(isinstance(tag, str) for tag in body['tags'])):
+                raise HttpError(400, "tags должен быть списком строк")
+            changes['tags'] = [tag.strip() for tag in body['tags'] if tag.strip()]
+        if 'completed' in body:
+            if not isinstance(body['completed'], bool):
+                raise HttpError(400, "completed должен быть true или false")
+            changes['completed'] = body['completed']
+
+        task_data = await self.store.write(update_task, task_id, changes)
+        if task_data is None:
+            raise HttpError(404, "задача не найдена")
+        return json_response(task_data)
+
+    async def delete_task(self, task_id):
+        if not await self.store.write(delete_task, task_id):
+            raise HttpError(404, "задача не найдена")
+        return json_response({'deleted': task_id})
+
+    async def bulk(self, request):
+        body = parse_body(request)
+        records = body.get('create', [])
+        if not isinstance(records, list):
+            raise HttpError(400, "create должен быть списком задач")
+
+        now = current_timestamp()
+        rows = []
+        for index, record in enumerate(records):
+            row, error = parse_record(record, now)
+            if error is not None:
+                raise HttpError(400, f"create[{index}]: {error}")
+            rows.append(row)
+
+        result = await self.store.write(apply_bulk, rows, parse_ids(body.get('complete', []), 'complete'),
+                                        parse_ids(body.get('uncomplete', []), 'uncomplete'),
+                                        parse_ids(body.get('delete', []), 'delete'))
+        return json_response(result)
+
+    async def changes(self, request):
+        if 'since' not in request.query:
+            raise HttpError(400, "нужен параметр since")
+        since = parse_int(request.query['since'][-1], 'since')
+        changes = await self.store.read(fetch_changes, since, request.query.get('tag', ()))
+        if changes is None:
+            raise HttpError(410, "изменений слишком много или журнал уже сжат, загрузите список заново")
+        return json_response(changes)
+
+    async def search(self, request):
+        query = request.query.get('q', [''])[-1]
+        limit = parse_limit(request.query.get('limit', [SEARCH_LIMIT])[-1])
+        include_archive = request.query.get('archive', ['0'])[-1] not in ('0', 'false')
+        return json_response(await self.store.read(search_tasks, query, limit, include_archive))
+
+    async def tags(self, request):
+        tags = await self.store.read(DatabaseManager.get_tags)
+        return json_response([{'name': name, 'count': count} for name, count in tags])
+
+
+async def read_request(reader):
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError as error:
+        if error.partial.strip():
+            raise HttpError(400, "запрос оборван") from None
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(400, "слишком длинные заголовки") from None
+
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, version = lines[0].split(' ')
+    except ValueError:
+        raise HttpError(400, "некорректная строка запроса") from None
+
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+    if 'transfer-encoding' in headers:
+        raise HttpError(411, "тело запроса должно иметь Content-Length")
+    length = parse_int(headers.get('content-length', 0), 'Content-Length')
+    if length < 0:
+        raise HttpError(400, "некорректный Content-Length")
+    if length > MAX_BODY_SIZE:
+        raise HttpError(413, "слишком большое тело запроса")
+    body = await reader.readexactly(length) if length else b''
+
+    connection = headers.get('connection', '').lower()
+    if version == 'HTTP/1.0':
+        keep_alive = False
+    elif version == 'HTTP/1.1':
+        keep_alive = connection != 'close'
+    else:
+        raise HttpError(400, "неподдерживаемая версия HTTP")
+
+    url = urlsplit(target.encode('latin-1').decode('utf-8', 'replace'))
+    return Request(method, unquote(url.path), parse_qs(url.query), body, version, keep_alive)
+
+
+async def write_response(writer, response, version, keep_alive):
+    head = [f"{version} {response.status} {REASONS[response.status]}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+
+    if response.chunks is None:
+        head.append(f"Content-Length: {len(response.body)}")
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + response.body)
+        await writer.drain()
+        return
+
+    if version == 'HTTP/1.0':
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+        async for chunk in response.chunks:
+            writer.write(chunk)
+            await writer.drain()
+        return
+
+    head.append("Transfer-Encoding: chunked")
+    writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+    async for chunk in response.chunks:
+        writer.write(b'%x\r\n%b\r\n' % (len(chunk), chunk))
+        await writer.drain()
+    writer.write(b'0\r\n\r\n')
+    await writer.drain()
+
+
+class Connection:
+    def __init__(self, api, reader, writer):
+        self.api = api
+        self.reader = reader
+        self.writer = writer
+        self.responses = asyncio.Queue(PIPELINE_DEPTH)
+        self.last_sent = None
+        self.last_write = None
+
+    async def serve(self):
+        sender = asyncio.create_task(self.send_responses())
+        try:
+            while not sender.done():
+                try:
+                    request = await read_request(self.reader)
+                except HttpError as error:
+                    await self.enqueue(asyncio.create_task(self.fail(error)), 'HTTP/1.1', False)
+                    break
+                if request is None:
+                    break
+
+                if request.method == 'GET':
+                    waiting = self.last_write
+                    handler = asyncio.create_task(self.dispatch(request, waiting))
+                else:
+                    waiting = self.last_sent
+                    handler = self.last_write = asyncio.create_task(self.dispatch(request, waiting))
+                await self.enqueue(handler, request.version, request.keep_alive)
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            await self.responses.put(None)
+            await sender
+            self.writer.close()
+
+    async def enqueue(self, handler, version, keep_alive):
+        self.last_sent = asyncio.get_running_loop().create_future()
+        await self.responses.put((handler, version, keep_alive, self.last_sent))
+
+    async def fail(self, error):
+        return error_response(error.status, str(error))
+
+    async def dispatch(self, request, waiting):
+        if waiting is not None:
+            await asyncio.wait([waiting])
+        try:
+            return await self.api.handle(request)
+        except HttpError as error:
+            return error_response(error.status, str(error))
+        except sqlite3.Error as error:
+            return error_response(500, f"ошибка базы данных: {error}")
+        except Exception:
+            traceback.print_exc()
+            return error_response(500, "внутренняя ошибка сервера")
+
+    async def send_responses(self):
+        broken = False
+        while True:
+            item = await self.responses.get()
+            if item is None:
+                return
+            handler, version, keep_alive, sent = item
+
+            if broken:
+                handler.cancel()
+                sent.set_result(None)
+                continue
+
+            try:
+                response = await handler
+                await write_response(self.writer, response, version, keep_alive)
+            except ConnectionError:
+                broken = True
+            except Exception:
+                traceback.print_exc()
+                broken = True
+            finally:
+                sent.set_result(None)
+
+            if broken:
+                self.writer.close()
+
+
+async def maintain_database(store):
+    while True:
+        await store.write(DatabaseManager.compact_changes)
+        while await store.write(DatabaseManager.archive_due_tasks):
+            pass
+        await asyncio.sleep(MAINTENANCE_INTERVAL)
+
+
+async def serve(args):
+    store = TaskStore(args.db, args.readers)
+    api = TaskApi(store)
+    while await store.write(DatabaseManager.index_search_backlog):
+        pass
+    maintenance = asyncio.create_task(maintain_database(store))
+
+    async def on_connection(reader, writer):
+        await Connection(api, reader, writer).serve()
+
+    server = await asyncio.start_server(on_connection, args.host, args.port, limit=MAX_HEADER_SIZE)
+    address = server.sockets[0].getsockname()
+    print(f"todo_api слушает http://{address[0]}:{address[1]}", file=sys.stderr, flush=True)
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        maintenance.cancel()
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный JSON API над todo_app.db")
+    parser.add_argument("--db", default=DEFAULT_DB_NAME, help=f"файл базы, по умолчанию {DEFAULT_DB_NAME}")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="0 — выбрать свободный порт")
+    parser.add_argument("--readers", type=int, default=DEFAULT_READERS, help="потоков для чтения из базы")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
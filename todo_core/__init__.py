@@ -0,0 +1,8 @@
+from .collection import TaskChange, TaskCollection
+from .dates import TEXT_DATETIME_FORMAT, current_timestamp, format_export_timestamp, parse_text_datetime
+from .records import TAG_SEPARATOR, Task, is_overdue, split_tags, tag_key, task_order_ts, task_sort_key
+from .storage import (ARCHIVE_BATCH_SIZE, CHANGE_JOURNAL_KEEP, CHANGES_LIMIT, DEFAULT_ARCHIVE_AFTER_DAYS,
+                      DEFAULT_REMINDER_OFFSETS, SEARCH_BACKLOG_BATCH_SIZE, SEARCH_RESULTS_LIMIT, TASKS_PAGE_SIZE,
+                      ChangeSet, DatabaseManager, MigrationError, build_search_query, tag_filter_conditions)
+from .transfer import (EXPORT_HEADER, IMPORT_BATCH_SIZE, IMPORT_FIELDS, ImportResult, export_record, export_tasks,
+                       export_tasks_csv, export_tasks_jsonl, import_tasks, iter_import_records, validate_import_record)
@@ -0,0 +1,221 @@
+from bisect import bisect_left
+from collections import namedtuple
+
+from .records import Task, task_sort_key
+
+TaskChange = namedtuple('TaskChange', ['kind', 'first', 'last', 'destination'])
+SYNCED_FIELDS = ('title', 'description', 'deadline', 'date_of_creation', 'completed', 'completed_at', 'image', 'tags')
+LAYOUT_UPDATE_THRESHOLD = 64
+
+
+class TaskCollection:
+    def __init__(self, tasks=None):
+        self.listeners = []
+        self.tasks = []
+        self.keys = []
+        self.by_id = {}
+        self.version = 0
+        self.has_more = tasks is None
+        self.load(tasks or [])
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def __getitem__(self, row):
+        return self.tasks[row]
+
+    def __iter__(self):
+        return iter(self.tasks)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def notify(self, stage, change):
+        if stage == 'before_change':
+            self.version += 1
+        for listener in self.listeners:
+            getattr(listener, stage)(change)
+
+    def load(self, tasks):
+        self.tasks = sorted(tasks, key=task_sort_key)
+        self.keys = [task_sort_key(task_data) for task_data in self.tasks]
+        self.by_id = {task_data['id']: task_data for task_data in self.tasks}
+
+    def reset(self, tasks=None):
+        change = TaskChange('reset', 0, len(self.tasks) - 1, None)
+        self.notify('before_change', change)
+        self.has_more = tasks is None
+        self.load(tasks or [])
+        self.notify('after_change', change)
+
+    def is_loaded(self, key):
+        if not self.has_more:
+            return True
+        return bool(self.keys) and key <= self.keys[-1]
+
+    def extend(self, tasks, has_more):
+        if tasks:
+            first = len(self.tasks)
+            change = TaskChange('insert', first, first + len(tasks) - 1, None)
+            self.notify('before_change', change)
+            for task_data in tasks:
+                self.tasks.append(task_data)
+                self.keys.append(task_sort_key(task_data))
+                self.by_id[task_data['id']] = task_data
+            self.notify('after_change', change)
+
+        self.has_more = has_more
+
+    def get(self, task_id):
+        return self.by_id.get(task_id)
+
+    def row_of(self, task_id):
+        task_data = self.by_id.get(task_id)
+        if task_data is None:
+            return -1
+        return bisect_left(self.keys, task_sort_key(task_data))
+
+    def insert(self, task_data):
+        key = task_sort_key(task_data)
+        if not self.is_loaded(key):
+            return -1
+        row = bisect_left(self.keys, key)
+
+        change = TaskChange('insert', row, row, None)
+        self.notify('before_change', change)
+        self.tasks.insert(row, task_data)
+        self.keys.insert(row, key)
+        self.by_id[task_data['id']] = task_data
+        self.notify('after_change', change)
+
+        return row
+
+    def update(self, task_id, changes):
+        if task_id not in self.by_id:
+            return -1
+
+        row = self.row_of(task_id)
+        task_data = self.tasks[row]
+
+        new_key = task_sort_key({**task_data, **changes})
+        if not self.is_loaded(new_key):
+            self.remove(task_id)
+            return -1
+
+        position = bisect_left(self.keys, new_key)
+        new_row = position - 1 if position > row else position
+
+        if new_row == row:
+            task_data.update(changes)
+            self.keys[row] = new_key
+            change = TaskChange('update', row, row, None)
+            self.notify('before_change', change)
+            self.notify('after_change', change)
+            return row
+
+        change = TaskChange('move', row, row, new_row)
+        self.notify('before_change', change)
+        task_data.update(changes)
+        del self.tasks[row]
+        del self.keys[row]
+        self.tasks.insert(new_row, task_data)
+        self.keys.insert(new_row, new_key)
+        self.notify('after_change', change)
+
+        return new_row
+
+    def remove(self, task_id):
+        if task_id not in self.by_id:
+            return None
+
+        row = self.row_of(task_id)
+
+        change = TaskChange('remove', row, row, None)
+        self.notify('before_change', change)
+        task_data = self.tasks.pop(row)
+        del self.keys[row]
+        del self.by_id[task_id]
+        self.notify('after_change', change)
+
+        return task_data
+
+    def restore(self, task_data):
+        if task_data['id'] in self.by_id:
+            return self.update(task_data['id'], task_data)
+        return self.insert(Task(**task_data))
+
+    def update_many(self, task_ids, changes):
+        task_ids = [task_id for task_id in task_ids if task_id in self.by_id]
+        if len(task_ids) <= LAYOUT_UPDATE_THRESHOLD:
+            for task_id in task_ids:
+                self.update(task_id, changes)
+            return
+
+        leaving = {
+            task_id for task_id in task_ids
+            if not self.is_loaded(task_sort_key({**self.by_id[task_id], **changes}))
+        }
+        if leaving:
+            self.remove_where(lambda task_data: task_data['id'] in leaving)
+
+        staying = [self.by_id[task_id] for task_id in task_ids if task_id not in leaving]
+        if not staying:
+            return
+
+        change = TaskChange('layout', 0, len(self.tasks) - 1, None)
+        self.notify('before_change', change)
+        for task_data in staying:
+            task_data.update(changes)
+        self.tasks.sort(key=task_sort_key)
+        self.keys = [task_sort_key(task_data) for task_data in self.tasks]
+        self.notify('after_change', change)
+
+    def remove_where(self, predicate):
+        rows = [row for row, task_data in enumerate(self.tasks) if predicate(task_data)]
+
+        ranges = []
+        for row in rows:
+            if ranges and ranges[-1][1] == row - 1:
+                ranges[-1][1] = row
+            else:
+                ranges.append([row, row])
+
+        removed = []
+        for first, last in reversed(ranges):
+            change = TaskChange('remove', first, last, None)
+            self.notify('before_change', change)
+            removed[:0] = self.tasks[first:last + 1]
+            del self.tasks[first:last + 1]
+            del self.keys[first:last + 1]
+            self.notify('after_change', change)
+
+        for task_data in removed:
+            del self.by_id[task_data['id']]
+
+        return removed
+
+    def sync(self, tasks, has_more=False):
+        fresh = {task_data['id']: task_data for task_data in tasks}
+        self.remove_where(lambda task_data: task_data['id'] not in fresh)
+
+        self.has_more = False
+        for task_data in tasks:
+            self.upsert(task_data)
+        self.has_more = has_more
+
+    def apply_changes(self, tasks, removed_ids):
+        removed_ids = set(removed_ids)
+        self.remove_where(lambda task_data: task_data['id'] in removed_ids)
+
+        for task_data in tasks:
+            self.upsert(task_data)
+
+    def upsert(self, task_data):
+        current = self.by_id.get(task_data['id'])
+        if current is None:
+            return self.insert(task_data)
+
+        changes = {field: task_data[field] for field in SYNCED_FIELDS if current[field] != task_data[field]}
+        if changes:
+            return self.update(task_data['id'], changes)
+        return self.row_of(task_data['id'])
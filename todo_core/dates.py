@@ -0,0 +1,54 @@
+import time
+from functools import lru_cache
+
+TEXT_DATETIME_FORMAT = "%d.%m.%Y %H:%M"
+DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def current_timestamp():
+    return int(time.time())
+
+
+def days_in_month(year, month):
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return DAYS_IN_MONTH[month - 1]
+
+
+@lru_cache(maxsize=65536)
+def parse_text_hour(value):
+    if value[2] != '.' or value[5] != '.' or value[10] != ' ':
+        return None
+
+    try:
+        day, month, year, hour = int(value[0:2]), int(value[3:5]), int(value[6:10]), int(value[11:13])
+    except ValueError:
+        return None
+
+    if not (1 <= month <= 12 and 1 <= day <= days_in_month(year, month) and 0 <= hour < 24):
+        return None
+
+    return int(time.mktime((year, month, day, hour, 0, 0, 0, 0, -1)))
+
+
+@lru_cache(maxsize=65536)
+def parse_text_datetime(value):
+    if not isinstance(value, str):
+        return None
+
+    value = value.strip()
+    if len(value) != 16 or value[13] != ':':
+        return None
+
+    hour_start = parse_text_hour(value[:13])
+    minute = value[14:16]
+    if hour_start is None or not (minute.isascii() and minute.isdigit()) or minute >= '60':
+        return None
+
+    return hour_start + int(minute) * 60
+
+
+def format_export_timestamp(timestamp):
+    if timestamp is None:
+        return ''
+    return time.strftime(TEXT_DATETIME_FORMAT, time.localtime(timestamp))
@@ -0,0 +1,71 @@
+import sys
+from functools import lru_cache
+
+TAG_SEPARATOR = '\x1f'
+
+
+@lru_cache(maxsize=4096)
+def split_tags(value):
+    if not value:
+        return ()
+    return tuple(sorted(sys.intern(tag) for tag in value.split(TAG_SEPARATOR)))
+
+
+def tag_key(name):
+    return name.casefold()
+
+
+class Task:
+    __slots__ = ('id', 'title', 'description', 'deadline', 'date_of_creation', 'completed', 'completed_at',
+                 'image', 'tags', 'overdue', 'archived')
+
+    def __init__(self, id, title, description, deadline, date_of_creation, completed=False, completed_at=None,
+                 image=None, tags=(), overdue=False, archived=False):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.deadline = deadline
+        self.date_of_creation = date_of_creation
+        self.completed = completed
+        self.completed_at = completed_at
+        self.image = image
+        self.tags = tags
+        self.overdue = overdue
+        self.archived = archived
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        return cls(row[0], row[1], row[2], row[3], row[4], row[5] == 1, row[6], row[7], split_tags(row[8]))
+
+    def keys(self):
+        return self.__slots__
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def update(self, changes):
+        for key, value in changes.items():
+            setattr(self, key, value)
+
+
+def task_order_ts(task_data):
+    if task_data['completed']:
+        return -(task_data['completed_at'] or 0)
+    return task_data['deadline']
+
+
+def task_sort_key(task_data):
+    return (task_data['completed'], task_order_ts(task_data), task_data['id'])
+
+
+def is_overdue(task_data, now):
+    return not task_data['completed'] and task_data['deadline'] <= now
@@ -0,0 +1,928 @@
+import sqlite3
+import time
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+
+from .dates import current_timestamp, parse_text_datetime
+from .records import Task, split_tags, tag_key
+
+MIGRATION_BATCH_SIZE = 5000
+TASKS_PAGE_SIZE = 200
+SEARCH_RESULTS_LIMIT = 500
+SEARCH_BACKLOG_BATCH_SIZE = 5000
+DEFAULT_REMINDER_OFFSETS = (60 * 60, 24 * 60 * 60)
+BUSY_TIMEOUT_MS = 5000
+LOCK_RETRIES = 3
+LOCK_RETRY_DELAY = 0.05
+CHANGES_LIMIT = 1000
+CHANGE_JOURNAL_KEEP = 10000
+ARCHIVE_BATCH_SIZE = 1000
+TAG_LOOKUP_BATCH_SIZE = 500
+DEFAULT_ARCHIVE_AFTER_DAYS = 0
+FTS_INSERT_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+'''
+CHANGES_INSERT_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS task_changes_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO task_changes (task_id, operation) VALUES (new.id, 'insert');
+    END
+'''
+CHANGES_TAGS_INSERT_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS task_changes_tags_insert AFTER INSERT ON task_tags
+    WHEN EXISTS (SELECT 1 FROM tasks WHERE id = new.task_id)
+    BEGIN
+        INSERT INTO task_changes (task_id, operation) VALUES (new.task_id, 'update');
+    END
+'''
+TAGS_COUNT_INSERT_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS task_tags_count_insert AFTER INSERT ON task_tags BEGIN
+        UPDATE tags SET task_count = task_count + 1 WHERE id = new.tag_id;
+    END
+'''
+TASK_TAGS = '''
+    (SELECT group_concat(tags.name, char(31))
+     FROM task_tags JOIN tags ON tags.id = task_tags.tag_id
+     WHERE task_tags.task_id = tasks.id)
+'''
+TASK_COLUMNS = f'''
+    id, title, description, deadline_ts, date_of_creation_ts, completed, completed_at_ts, image,
+    {TASK_TAGS}
+'''
+ARCHIVED_TASK_COLUMNS = '''
+    id, title, description, deadline_ts, date_of_creation_ts, 1, completed_at_ts, image, tags
+'''
+
+ChangeSet = namedtuple('ChangeSet', ['version', 'tasks', 'removed_ids'])
+
+
+class MigrationError(sqlite3.DatabaseError):
+    pass
+
+
+def search_row(cursor, row):
+    task_data = Task.from_row(cursor, row)
+    task_data.archived = row[10] == 1
+    return task_data
+
+
+def is_lock_error(error):
+    return isinstance(error, sqlite3.OperationalError) and \
+        error.sqlite_errorcode & 0xff in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+
+def build_search_query(text):
+    import re
+
+    tokens = re.findall(r'\w+', text)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def placeholders(values):
+    return ', '.join('?' * len(values))
+
+
+def tag_filter_conditions(all_of=(), any_of=(), none_of=()):
+    all_of, any_of, none_of = set(map(tag_key, all_of)), set(map(tag_key, any_of)), set(map(tag_key, none_of))
+    conditions = []
+    params = []
+
+    if all_of:
+        conditions.append(f'''id IN (
+            SELECT task_id FROM task_tags
+            WHERE tag_id IN (SELECT id FROM tags WHERE key IN ({placeholders(all_of)}))
+            GROUP BY task_id
+            HAVING COUNT(*) = ?
+        )''')
+        params += [*all_of, len(all_of)]
+
+    if any_of:
+        conditions.append(f'''id IN (
+            SELECT task_id FROM task_tags
+            WHERE tag_id IN (SELECT id FROM tags WHERE key IN ({placeholders(any_of)}))
+        )''')
+        params += any_of
+
+    if none_of:
+        conditions.append(f'''id NOT IN (
+            SELECT task_id FROM task_tags
+            WHERE tag_id IN (SELECT id FROM tags WHERE key IN ({placeholders(none_of)}))
+        )''')
+        params += none_of
+
+    return conditions, params
+
+
+class DatabaseManager:
+    def __init__(self, db_name="todo_app.db"):
+        self.db_name = db_name
+        self.conn = sqlite3.connect(self.db_name, isolation_level=None, cached_statements=256)
+        self.transaction_depth = 0
+        self.configure_connection()
+        self.init_database()
+
+    def configure_connection(self):
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+        self.conn.execute('PRAGMA cache_size = -8000')
+        self.conn.execute('PRAGMA temp_store = MEMORY')
+        self.conn.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+
+    def begin(self):
+        for attempt in range(LOCK_RETRIES):
+            try:
+                self.conn.execute('BEGIN IMMEDIATE')
+                return
+            except sqlite3.OperationalError as error:
+                if not is_lock_error(error) or attempt == LOCK_RETRIES - 1:
+                    raise
+                time.sleep(LOCK_RETRY_DELAY * (attempt + 1))
+
+    @contextmanager
+    def transaction(self):
+        savepoint = f'sp_{self.transaction_depth}'
+        if self.transaction_depth == 0:
+            self.begin()
+        else:
+            self.conn.execute(f'SAVEPOINT {savepoint}')
+        self.transaction_depth += 1
+
+        try:
+            yield self.conn
+        except BaseException:
+            self.transaction_depth -= 1
+            if self.transaction_depth == 0:
+                self.conn.execute('ROLLBACK')
+            else:
+                self.conn.execute(f'ROLLBACK TO {savepoint}')
+                self.conn.execute(f'RELEASE {savepoint}')
+            raise
+        else:
+            self.transaction_depth -= 1
+            if self.transaction_depth == 0:
+                self.conn.execute('COMMIT')
+            else:
+                self.conn.execute(f'RELEASE {savepoint}')
+
+    def close(self):
+        self.conn.close()
+
+    def init_database(self):
+        if self.conn.execute('PRAGMA user_version').fetchone()[0] == len(self.schema_migrations()):
+            return
+
+        with self.transaction():
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    description TEXT,
+                    deadline TEXT NOT NULL,
+                    date_of_creation TEXT NOT NULL,
+                    completed BOOLEAN DEFAULT 0,
+                    completed_at TEXT
+                )
+            ''')
+
+        self.migrate_database()
+
+    def schema_migrations(self):
+        return [self.migrate_to_timestamps, self.migrate_to_full_text_search, self.migrate_to_tags,
+                self.migrate_to_images, self.migrate_to_search_backlog,
+                self.migrate_to_overdue_ordering, self.migrate_to_reminders,
+                self.migrate_to_change_journal, self.migrate_to_archive, self.migrate_to_tag_keys]
+
+    def migrate_database(self):
+        migrations = self.schema_migrations()
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        for number, migration in enumerate(migrations[version:], start=version + 1):
+            with self.transaction():
+                migration()
+                self.conn.execute(f'PRAGMA user_version = {number}')
+
+    def migrate_to_timestamps(self):
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(tasks)')}
+
+        with self.transaction():
+            for column in ('deadline_ts', 'date_of_creation_ts', 'completed_at_ts'):
+                if column not in columns:
+                    self.conn.execute(f'ALTER TABLE tasks ADD COLUMN {column} INTEGER')
+
+        if 'deadline' in columns:
+            unparsed_ids = []
+            last_id = 0
+            while True:
+                rows = self.conn.execute('''
+                    SELECT id, deadline, date_of_creation, completed_at
+                    FROM tasks
+                    WHERE id > ?
+                    ORDER BY id
+                    LIMIT ?
+                ''', (last_id, MIGRATION_BATCH_SIZE)).fetchall()
+                if not rows:
+                    break
+
+                values = [
+                    (
+                        parse_text_datetime(deadline),
+                        parse_text_datetime(date_of_creation),
+                        parse_text_datetime(completed_at),
+                        task_id
+                    )
+                    for task_id, deadline, date_of_creation, completed_at in rows
+                ]
+                unparsed_ids += [
+                    task_id
+                    for (task_id, _, _, completed_at), (deadline_ts, date_of_creation_ts, completed_at_ts, _)
+                    in zip(rows, values)
+                    if deadline_ts is None or date_of_creation_ts is None or (completed_at and completed_at_ts is None)
+                ]
+
+                with self.transaction():
+                    self.conn.executemany('''
+                        UPDATE tasks
+                        SET deadline_ts = ?, date_of_creation_ts = ?, completed_at_ts = ?
+                        WHERE id = ?
+                    ''', values)
+                last_id = rows[-1][0]
+
+            if unparsed_ids:
+                shown = ', '.join(map(str, unparsed_ids[:20]))
+                more = f" и ещё {len(unparsed_ids) - 20}" if len(unparsed_ids) > 20 else ""
+                raise MigrationError(
+                    f"не удалось разобрать даты у задач {shown}{more}; "
+                    f"исправьте их в формате ДД.ММ.ГГГГ ЧЧ:ММ, база оставлена без изменений"
+                )
+
+        with self.transaction():
+            for column in ('deadline', 'date_of_creation', 'completed_at'):
+                if column in columns:
+                    self.conn.execute(f'ALTER TABLE tasks DROP COLUMN {column}')
+
+            self.conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_tasks_completed_deadline
+                ON tasks (completed, deadline_ts)
+            ''')
+            self.conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_tasks_completed_completed_at
+                ON tasks (completed, completed_at_ts)
+            ''')
+
+    def migrate_to_full_text_search(self):
+        with self.transaction():
+            self.conn.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                    title,
+                    description,
+                    content='tasks',
+                    content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2',
+                    prefix='2 3'
+                )
+            ''')
+
+            self.conn.execute(FTS_INSERT_TRIGGER)
+            self.conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+                    INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                    VALUES ('delete', old.id, old.title, old.description);
+                END
+            ''')
+            self.conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+                    INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                    VALUES ('delete', old.id, old.title, old.description);
+                    INSERT INTO tasks_fts (rowid, title, description)
+                    VALUES (new.id, new.title, new.description);
+                END
+            ''')
+
+            self.conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+    def migrate_to_tags(self):
+        with self.transaction():
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS tags (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+                    task_count INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS task_tags (
+                    task_id INTEGER NOT NULL,
+                    tag_id INTEGER NOT NULL,
+                    PRIMARY KEY (task_id, tag_id)
+                ) WITHOUT ROWID
+            ''')
+            self.conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_task_tags_tag
+                ON task_tags (tag_id, task_id)
+            ''')
+
+            self.conn.execute(TAGS_COUNT_INSERT_TRIGGER)
+            self.conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS task_tags_count_delete AFTER DELETE ON task_tags BEGIN
+                    UPDATE tags SET task_count = task_count - 1 WHERE id = old.tag_id;
+                END
+            ''')
+            self.conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS tasks_tags_delete AFTER DELETE ON tasks BEGIN
+                    DELETE FROM task_tags WHERE task_id = old.id;
+                END
+            ''')
+
+    def migrate_to_images(self):
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(tasks)')}
+
+        with self.transaction():
+            if 'image' not in columns:
+                self.conn.execute('ALTER TABLE tasks ADD COLUMN image TEXT')
+
+    def migrate_to_search_backlog(self):
+        with self.transaction():
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS search_index_backlog (
+                    first_id INTEGER NOT NULL,
+                    last_id INTEGER NOT NULL
+                )
+            ''')
+
+            self.conn.execute('DROP TRIGGER IF EXISTS tasks_fts_delete')
+            self.conn.execute('DROP TRIGGER IF EXISTS tasks_fts_update')
+            self.conn.execute('''
+                CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks
+                WHEN NOT EXISTS (SELECT 1 FROM search_index_backlog WHERE old.id BETWEEN first_id AND last_id)
+                BEGIN
+                    INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                    VALUES ('delete', old.id, old.title, old.description);
+                END
+            ''')
+            self.conn.execute('''
+                CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, description ON tasks
+                WHEN NOT EXISTS (SELECT 1 FROM search_index_backlog WHERE old.id BETWEEN first_id AND last_id)
+                BEGIN
+                    INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                    VALUES ('delete', old.id, old.title, old.description);
+                    INSERT INTO tasks_fts (rowid, title, description)
+                    VALUES (new.id, new.title, new.description);
+                END
+            ''')
+
+    def migrate_to_overdue_ordering(self):
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_xinfo(tasks)')}
+
+        with self.transaction():
+            if 'order_ts' not in columns:
+                self.conn.execute('''
+                    ALTER TABLE tasks ADD COLUMN order_ts INTEGER
+                    GENERATED ALWAYS AS (CASE completed WHEN 0 THEN deadline_ts ELSE -COALESCE(completed_at_ts, 0) END)
+                    VIRTUAL
+                ''')
+            self.conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_tasks_order
+                ON tasks (completed, order_ts, id)
+            ''')
+            self.conn.execute('DROP INDEX IF EXISTS idx_tasks_completed_completed_at')
+
+    def migrate_to_reminders(self):
+        with self.transaction():
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS reminder_offsets (
+                    seconds INTEGER PRIMARY KEY
+                )
+            ''')
+            self.conn.executemany('INSERT OR IGNORE INTO reminder_offsets (seconds) VALUES (?)',
+                                  [(offset,) for offset in DEFAULT_REMINDER_OFFSETS])
+
+    def migrate_to_change_journal(self):
+        with self.transaction():
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS task_changes (
+                    version INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task_id INTEGER NOT NULL,
+                    operation TEXT NOT NULL
+                )
+            ''')
+
+            self.conn.execute(CHANGES_INSERT_TRIGGER)
+            self.conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS task_changes_update AFTER UPDATE ON tasks BEGIN
+                    INSERT INTO task_changes (task_id, operation) VALUES (new.id, 'update');
+                END
+            ''')
+            self.conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS task_changes_delete AFTER DELETE ON tasks BEGIN
+                    INSERT INTO task_changes (task_id, operation) VALUES (old.id, 'delete');
+                END
+            ''')
+            self.conn.execute(CHANGES_TAGS_INSERT_TRIGGER)
+            self.conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS task_changes_tags_delete AFTER DELETE ON task_tags
+                WHEN EXISTS (SELECT 1 FROM tasks WHERE id = old.task_id)
+                BEGIN
+                    INSERT INTO task_changes (task_id, operation) VALUES (old.task_id, 'update');
+                END
+            ''')
+
+    def migrate_to_archive(self):
+        with self.transaction():
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS archived_tasks (
+                    id INTEGER PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    description TEXT,
+                    deadline_ts INTEGER NOT NULL,
+                    date_of_creation_ts INTEGER NOT NULL,
+                    completed_at_ts INTEGER,
+                    image TEXT,
+                    tags TEXT
+                )
+            ''')
+            self.conn.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS archived_tasks_fts USING fts5(
+                    title,
+                    description,
+                    content='archived_tasks',
+                    content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2',
+                    prefix='2 3'
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS archived_tasks_fts_insert AFTER INSERT ON archived_tasks BEGIN
+                    INSERT INTO archived_tasks_fts (rowid, title, description)
+                    VALUES (new.id, new.title, new.description);
+                END
+            ''')
+            self.conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS archived_tasks_fts_delete AFTER DELETE ON archived_tasks BEGIN
+                    INSERT INTO archived_tasks_fts (archived_tasks_fts, rowid, title, description)
+                    VALUES ('delete', old.id, old.title, old.description);
+                END
+            ''')
+
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS settings (
+                    name TEXT PRIMARY KEY,
+                    value
+                ) WITHOUT ROWID
+            ''')
+            self.conn.execute("INSERT OR IGNORE INTO settings (name, value) VALUES ('archive_after_days', ?)",
+                              (DEFAULT_ARCHIVE_AFTER_DAYS,))
+
+    def migrate_to_tag_keys(self):
+        with self.transaction():
+            columns = {row[1] for row in self.conn.execute('PRAGMA table_info(tags)')}
+            if 'key' not in columns:
+                self.conn.execute("ALTER TABLE tags ADD COLUMN key TEXT NOT NULL DEFAULT ''")
+
+            kept_ids = {}
+            for tag_id, name in self.conn.execute('SELECT id, name FROM tags ORDER BY id').fetchall():
+                key = tag_key(name)
+                kept_id = kept_ids.setdefault(key, tag_id)
+                if kept_id == tag_id:
+                    self.conn.execute('UPDATE tags SET key = ? WHERE id = ?', (key, tag_id))
+                    continue
+
+                self.conn.execute('''
+                    INSERT OR IGNORE INTO task_tags (task_id, tag_id)
+                    SELECT task_id, ? FROM task_tags WHERE tag_id = ?
+                ''', (kept_id, tag_id))
+                self.conn.execute('DELETE FROM task_tags WHERE tag_id = ?', (tag_id,))
+                self.conn.execute('DELETE FROM tags WHERE id = ?', (tag_id,))
+
+            self.conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_tags_key ON tags (key)')
+
+    def select_tasks(self, query, params=(), row_factory=Task.from_row):
+        cursor = self.conn.cursor()
+        cursor.row_factory = row_factory
+        return cursor.execute(query, params).fetchall()
+
+    def get_all_tasks(self):
+        return self.select_tasks(f'''
+            SELECT {TASK_COLUMNS}
+            FROM tasks
+            ORDER BY completed, order_ts, id
+        ''')
+
+    def get_tasks_by_ids(self, task_ids):
+        task_ids = list(task_ids)
+        return self.select_tasks(f'''
+            SELECT {TASK_COLUMNS}
+            FROM tasks
+            WHERE id IN ({placeholders(task_ids)})
+            ORDER BY completed, order_ts, id
+        ''', task_ids)
+
+    def bulk_insert_tasks(self, rows):
+        with self.transaction():
+            first_id = self.conn.execute(
+                "SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'tasks'), 0) + 1"
+            ).fetchone()[0]
+
+            self.conn.execute('DROP TRIGGER tasks_fts_insert')
+            self.conn.execute('DROP TRIGGER task_changes_insert')
+            self.conn.executemany('''
+                INSERT INTO tasks (title, description, deadline_ts, date_of_creation_ts, completed, completed_at_ts)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [row[:6] for row in rows])
+            self.conn.execute(FTS_INSERT_TRIGGER)
+            self.conn.execute(CHANGES_INSERT_TRIGGER)
+
+            last_id = first_id + len(rows) - 1
+            self.conn.execute('''
+                WITH RECURSIVE ids (id) AS (SELECT ? UNION ALL SELECT id + 1 FROM ids WHERE id < ?)
+                INSERT INTO task_changes (task_id, operation)
+                SELECT id, 'insert' FROM ids
+            ''', (first_id, last_id))
+            self.conn.execute('INSERT INTO search_index_backlog (first_id, last_id) VALUES (?, ?)',
+                              (first_id, last_id))
+
+            tag_links = {
+                (task_id, tag_key(tag)): tag for task_id, row in enumerate(rows, start=first_id) for tag in row[6]
+            }
+            if tag_links:
+                names = {}
+                for (task_id, key), tag in tag_links.items():
+                    names.setdefault(key, tag)
+                self.conn.executemany('INSERT OR IGNORE INTO tags (name, key) VALUES (?, ?)',
+                                      [(name, key) for key, name in names.items()])
+
+                keys = list(names)
+                tag_ids = {}
+                for start in range(0, len(keys), TAG_LOOKUP_BATCH_SIZE):
+                    chunk = keys[start:start + TAG_LOOKUP_BATCH_SIZE]
+                    tag_ids.update(self.conn.execute(f'SELECT key, id FROM tags WHERE key IN ({placeholders(chunk)})',
+                                                     chunk))
+                links = [(task_id, tag_ids[key]) for task_id, key in tag_links]
+                counts = Counter(tag_id for task_id, tag_id in links)
+
+                self.conn.execute('DROP TRIGGER task_changes_tags_insert')
+                self.conn.execute('DROP TRIGGER task_tags_count_insert')
+                self.conn.executemany('INSERT INTO task_tags (task_id, tag_id) VALUES (?, ?)', links)
+                self.conn.executemany('UPDATE tags SET task_count = task_count + ? WHERE id = ?',
+                                      [(count, tag_id) for tag_id, count in counts.items()])
+                self.conn.execute(TAGS_COUNT_INSERT_TRIGGER)
+                self.conn.execute(CHANGES_TAGS_INSERT_TRIGGER)
+
+        return len(rows)
+
+    def index_search_backlog(self, limit=SEARCH_BACKLOG_BATCH_SIZE):
+        with self.transaction():
+            backlog = self.conn.execute('''
+                SELECT rowid, first_id, last_id FROM search_index_backlog
+                ORDER BY first_id
+                LIMIT 1
+            ''').fetchone()
+            if backlog is None:
+                return 0
+
+            backlog_id, first_id, last_id = backlog
+            batch_last_id = min(last_id, first_id + limit - 1)
+
+            self.conn.execute('''
+                INSERT INTO tasks_fts (rowid, title, description)
+                SELECT id, title, description FROM tasks WHERE id BETWEEN ? AND ?
+            ''', (first_id, batch_last_id))
+
+            if batch_last_id == last_id:
+                self.conn.execute('DELETE FROM search_index_backlog WHERE rowid = ?', (backlog_id,))
+            else:
+                self.conn.execute('UPDATE search_index_backlog SET first_id = ? WHERE rowid = ?',
+                                  (batch_last_id + 1, backlog_id))
+
+        return batch_last_id - first_id + 1
+
+    def data_version(self):
+        return self.conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def change_version(self):
+        cursor = self.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'task_changes'")
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def changes_since(self, version, all_of=(), limit=CHANGES_LIMIT):
+        oldest = self.conn.execute('SELECT MIN(version) FROM task_changes').fetchone()[0]
+        if oldest is not None and version < oldest - 1:
+            return None
+
+        changed = self.conn.execute('''
+            SELECT task_id, MAX(version)
+            FROM task_changes
+            WHERE version > ?
+            GROUP BY task_id
+            LIMIT ?
+        ''', (version, limit + 1)).fetchall()
+        if len(changed) > limit:
+            return None
+        if not changed:
+            return ChangeSet(version, [], [])
+
+        task_ids = [task_id for task_id, _ in changed]
+        conditions, params = tag_filter_conditions(all_of)
+        conditions.append(f'id IN ({placeholders(task_ids)})')
+        tasks = self.select_tasks_page(conditions, [*params, *task_ids], None, -1)
+
+        present = {task.id for task in tasks}
+        removed_ids = [task_id for task_id in task_ids if task_id not in present]
+        return ChangeSet(max(last_version for _, last_version in changed), tasks, removed_ids)
+
+    def compact_changes(self, keep=CHANGE_JOURNAL_KEEP):
+        with self.transaction():
+            cursor = self.conn.execute('''
+                DELETE FROM task_changes
+                WHERE version <= (SELECT MAX(version) FROM task_changes) - ?
+            ''', (keep,))
+        return cursor.rowcount
+
+    def count_tasks(self, archived=False):
+        table = 'archived_tasks' if archived else 'tasks'
+        return self.conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+    def iter_task_rows(self, batch_size, archived=False):
+        columns, table = (ARCHIVED_TASK_COLUMNS, 'archived_tasks') if archived else (TASK_COLUMNS, 'tasks')
+        cursor = self.conn.execute(f'''
+            SELECT {columns}
+            FROM {table}
+            ORDER BY id
+        ''')
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+    def select_tasks_page(self, conditions, params, after_key, limit):
+        if after_key is not None:
+            conditions = [*conditions, '(completed, order_ts, id) > (?, ?, ?)']
+            params = [*params, *after_key]
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+
+        return self.select_tasks(f'''
+            SELECT {TASK_COLUMNS}
+            FROM tasks
+            {where}
+            ORDER BY completed, order_ts, id
+            LIMIT ?
+        ''', (*params, limit))
+
+    def get_tasks_page(self, after_key=None, limit=TASKS_PAGE_SIZE):
+        return self.select_tasks_page([], [], after_key, limit)
+
+    def get_tasks_by_tags(self, all_of=(), any_of=(), none_of=(), after_key=None, limit=TASKS_PAGE_SIZE):
+        conditions, params = tag_filter_conditions(all_of, any_of, none_of)
+        return self.select_tasks_page(conditions, params, after_key, limit)
+
+    def get_tags(self):
+        cursor = self.conn.execute('SELECT name, task_count FROM tags WHERE task_count > 0 ORDER BY name')
+        return cursor.fetchall()
+
+    def set_task_tags(self, task_id, tag_names):
+        names = {}
+        for name in tag_names:
+            names.setdefault(tag_key(name), name)
+        keys = list(names)
+
+        with self.transaction():
+            self.conn.executemany('INSERT OR IGNORE INTO tags (name, key) VALUES (?, ?)',
+                                  [(name, key) for key, name in names.items()])
+            tag_ids = [row[0] for row in self.conn.execute(
+                f'SELECT id FROM tags WHERE key IN ({placeholders(keys)})', keys
+            )]
+
+            self.conn.execute(
+                f'DELETE FROM task_tags WHERE task_id = ? AND tag_id NOT IN ({placeholders(tag_ids)})',
+                (task_id, *tag_ids)
+            )
+            self.conn.executemany('INSERT OR IGNORE INTO task_tags (task_id, tag_id) VALUES (?, ?)',
+                                  [(task_id, tag_id) for tag_id in tag_ids])
+
+    def search(self, query, limit=SEARCH_RESULTS_LIMIT, include_archive=False):
+        match = build_search_query(query)
+        if not match:
+            return []
+
+        if not include_archive:
+            return self.select_tasks(f'''
+                WITH matches AS (
+                    SELECT rowid, rank
+                    FROM tasks_fts
+                    WHERE tasks_fts MATCH ?
+                    ORDER BY rank
+                    LIMIT ?
+                )
+                SELECT {TASK_COLUMNS}
+                FROM matches
+                JOIN tasks ON tasks.id = matches.rowid
+                ORDER BY matches.rank
+            ''', (match, limit))
+
+        return self.select_tasks(f'''
+            WITH matches AS (
+                SELECT rowid, rank
+                FROM tasks_fts
+                WHERE tasks_fts MATCH ?
+                ORDER BY rank
+                LIMIT ?
+            ), archived_matches AS (
+                SELECT rowid, rank
+                FROM archived_tasks_fts
+                WHERE archived_tasks_fts MATCH ?
+                ORDER BY rank
+                LIMIT ?
+            )
+            SELECT {TASK_COLUMNS}, matches.rank, 0
+            FROM matches
+            JOIN tasks ON tasks.id = matches.rowid
+            UNION ALL
+            SELECT {ARCHIVED_TASK_COLUMNS}, archived_matches.rank, 1
+            FROM archived_matches
+            JOIN archived_tasks ON archived_tasks.id = archived_matches.rowid
+            ORDER BY 10
+            LIMIT ?
+        ''', (match, limit, match, limit, limit), search_row)
+
+    def get_reminder_offsets(self):
+        cursor = self.conn.execute('SELECT seconds FROM reminder_offsets ORDER BY seconds')
+        return [row[0] for row in cursor.fetchall()]
+
+    def set_reminder_offsets(self, offsets):
+        with self.transaction():
+            self.conn.execute('DELETE FROM reminder_offsets')
+            self.conn.executemany('INSERT INTO reminder_offsets (seconds) VALUES (?)',
+                                  [(offset,) for offset in offsets])
+
+    def get_archive_after_days(self):
+        cursor = self.conn.execute("SELECT value FROM settings WHERE name = 'archive_after_days'")
+        return cursor.fetchone()[0]
+
+    def set_archive_after_days(self, days):
+        with self.transaction():
+            self.conn.execute("UPDATE settings SET value = ? WHERE name = 'archive_after_days'", (days,))
+
+    def get_reminders(self, start, end, offsets):
+        reminders = []
+        for offset in offsets:
+            cursor = self.conn.execute('''
+                SELECT id, title, deadline_ts
+                FROM tasks
+                WHERE completed = 0 AND deadline_ts >= ? AND deadline_ts < ?
+            ''', (start + offset, end + offset))
+            reminders.extend((deadline - offset, task_id, offset, title, deadline)
+                             for task_id, title, deadline in cursor.fetchall())
+        return reminders
+
+    def has_completed_tasks(self):
+        cursor = self.conn.execute('SELECT EXISTS (SELECT 1 FROM tasks WHERE completed = 1)')
+        return bool(cursor.fetchone()[0])
+
+    def add_task(self, task_data):
+        with self.transaction():
+            cursor = self.conn.execute('''
+                INSERT INTO tasks (title, description, deadline_ts, date_of_creation_ts, completed, image)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (
+                task_data['title'],
+                task_data['description'],
+                task_data['deadline'],
+                task_data['date_of_creation'],
+                0,
+                task_data.get('image')
+            ))
+
+            if task_data.get('tags'):
+                self.set_task_tags(cursor.lastrowid, task_data['tags'])
+
+        return cursor.lastrowid
+
+    def update_task(self, task_id, task_data):
+        with self.transaction():
+            cursor = self.conn.execute('''
+                UPDATE tasks 
+                SET title = ?, description = ?, deadline_ts = ?, date_of_creation_ts = ?, image = ?
+                WHERE id = ?
+            ''', (
+                task_data['title'],
+                task_data['description'],
+                task_data['deadline'],
+                task_data['date_of_creation'],
+                task_data.get('image'),
+                task_id
+            ))
+
+            if cursor.rowcount and 'tags' in task_data:
+                self.set_task_tags(task_id, task_data['tags'])
+
+        return cursor.rowcount > 0
+
+    def delete_task(self, task_id):
+        with self.transaction():
+            self.conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+
+    def complete_task(self, task_id):
+        completed_at = current_timestamp()
+
+        with self.transaction():
+            self.conn.execute('''
+                UPDATE tasks 
+                SET completed = 1, completed_at_ts = ?
+                WHERE id = ?
+            ''', (completed_at, task_id))
+
+        return completed_at
+
+    def uncomplete_task(self, task_id):
+        with self.transaction():
+            self.conn.execute('''
+                UPDATE tasks 
+                SET completed = 0, completed_at_ts = NULL
+                WHERE id = ?
+            ''', (task_id,))
+
+    def clear_completed_tasks(self):
+        with self.transaction():
+            self.conn.execute('DELETE FROM tasks WHERE completed = 1')
+
+    def archive_completed_tasks(self, completed_before, limit=ARCHIVE_BATCH_SIZE):
+        with self.transaction():
+            task_ids = [row[0] for row in self.conn.execute('''
+                SELECT id FROM tasks
+                WHERE completed = 1 AND order_ts > ?
+                ORDER BY completed, order_ts DESC, id
+                LIMIT ?
+            ''', (-completed_before, limit))]
+            if not task_ids:
+                return 0
+
+            self.conn.execute(f'''
+                INSERT INTO archived_tasks (id, title, description, deadline_ts, date_of_creation_ts,
+                                            completed_at_ts, image, tags)
+                SELECT id, title, description, deadline_ts, date_of_creation_ts, completed_at_ts, image, {TASK_TAGS}
+                FROM tasks
+                WHERE id IN ({placeholders(task_ids)})
+            ''', task_ids)
+            self.conn.execute(f'DELETE FROM tasks WHERE id IN ({placeholders(task_ids)})', task_ids)
+
+        return len(task_ids)
+
+    def archive_due_tasks(self, limit=ARCHIVE_BATCH_SIZE):
+        days = self.get_archive_after_days()
+        if not days:
+            return 0
+        return self.archive_completed_tasks(current_timestamp() - days * 24 * 60 * 60, limit)
+
+    def restore_archived_tasks(self, task_ids):
+        task_ids = list(task_ids)
+
+        with self.transaction():
+            rows = self.conn.execute(f'''
+                SELECT id, title, description, deadline_ts, date_of_creation_ts, completed_at_ts, image, tags
+                FROM archived_tasks
+                WHERE id IN ({placeholders(task_ids)})
+            ''', task_ids).fetchall()
+
+            self.conn.executemany('''
+                INSERT INTO tasks (id, title, description, deadline_ts, date_of_creation_ts, completed,
+                                   completed_at_ts, image)
+                VALUES (?, ?, ?, ?, ?, 1, ?, ?)
+            ''', [row[:7] for row in rows])
+            for row in rows:
+                if row[7]:
+                    self.set_task_tags(row[0], split_tags(row[7]))
+
+            self.conn.execute(f'DELETE FROM archived_tasks WHERE id IN ({placeholders(task_ids)})', task_ids)
+
+        return [row[0] for row in rows]
+
+    def bulk_complete(self, task_ids, completed_at=None):
+        if completed_at is None:
+            completed_at = current_timestamp()
+
+        with self.transaction():
+            cursor = self.conn.executemany('''
+                UPDATE tasks
+                SET completed = 1, completed_at_ts = ?
+                WHERE id = ?
+            ''', [(completed_at, task_id) for task_id in task_ids])
+
+        return cursor.rowcount
+
+    def bulk_uncomplete(self, task_ids):
+        with self.transaction():
+            cursor = self.conn.executemany('''
+                UPDATE tasks
+                SET completed = 0, completed_at_ts = NULL
+                WHERE id = ?
+            ''', [(task_id,) for task_id in task_ids])
+
+        return cursor.rowcount
+
+    def bulk_delete(self, task_ids):
+        with self.transaction():
+            cursor = self.conn.executemany('DELETE FROM tasks WHERE id = ?', [(task_id,) for task_id in task_ids])
+
+        return cursor.rowcount
@@ -0,0 +1,255 @@
+import os
+from collections import namedtuple
+from itertools import chain
+
+from .dates import current_timestamp, format_export_timestamp, parse_text_datetime
+from .records import TAG_SEPARATOR, Task
+
+EXPORT_BATCH_SIZE = 5000
+EXPORT_BUFFER_SIZE = 1024 * 1024
+EXPORT_HEADER = ("ID", "Название", "Описание", "Дедлайн", "Дата создания", "Выполнена", "Дата выполнения", "Теги")
+IMPORT_BATCH_SIZE = 10000
+IMPORT_REJECTED_LIMIT = 1000
+IMPORT_CANCEL_CHECK_LINES = 1000
+IMPORT_TEXT_FIELDS = ('title', 'description', 'deadline', 'date_of_creation', 'completed_at')
+IMPORT_RECORD_FIELDS = ('title', 'description', 'deadline', 'date_of_creation', 'completed', 'completed_at', 'tags')
+COMPLETED_VALUES = frozenset(('да', '1', 'true', 'yes'))
+IMPORT_FIELDS = {
+    "Название": 'title', "title": 'title',
+    "Описание": 'description', "description": 'description',
+    "Дедлайн": 'deadline', "deadline": 'deadline',
+    "Дата создания": 'date_of_creation', "date_of_creation": 'date_of_creation',
+    "Выполнена": 'completed', "completed": 'completed',
+    "Дата выполнения": 'completed_at', "completed_at": 'completed_at',
+    "Теги": 'tags', "tags": 'tags',
+}
+
+
+def export_batches(db, archived, include_archive):
+    sources = (False, True) if include_archive else (archived,)
+    total = sum(db.count_tasks(source) for source in sources)
+    return total, chain.from_iterable(db.iter_task_rows(EXPORT_BATCH_SIZE, source) for source in sources)
+
+
+def export_tasks_csv(db, path, progress=None, is_cancelled=None, archived=False, include_archive=False):
+    import csv
+
+    total, batches = export_batches(db, archived, include_archive)
+    exported = 0
+
+    with open(path, 'w', newline='', encoding='utf-8-sig', buffering=EXPORT_BUFFER_SIZE) as file:
+        writer = csv.writer(file)
+        writer.writerow(EXPORT_HEADER)
+
+        for rows in batches:
+            if is_cancelled is not None and is_cancelled():
+                break
+
+            writer.writerows(
+                (
+                    task_id,
+                    title,
+                    description,
+                    format_export_timestamp(deadline),
+                    format_export_timestamp(date_of_creation),
+                    "да" if completed else "нет",
+                    format_export_timestamp(completed_at),
+                    tags.replace(TAG_SEPARATOR, ", ") if tags else ""
+                )
+                for task_id, title, description, deadline, date_of_creation, completed, completed_at, image, tags
+                in rows
+            )
+            exported += len(rows)
+
+            if progress is not None:
+                progress(exported, total)
+
+    return exported
+
+
+def export_record(task_data):
+    return {
+        'id': task_data['id'],
+        'title': task_data['title'],
+        'description': task_data['description'],
+        'deadline': format_export_timestamp(task_data['deadline']),
+        'date_of_creation': format_export_timestamp(task_data['date_of_creation']),
+        'completed': task_data['completed'],
+        'completed_at': format_export_timestamp(task_data['completed_at']),
+        'tags': list(task_data['tags'])
+    }
+
+
+def export_tasks_jsonl(db, path, progress=None, is_cancelled=None, archived=False, include_archive=False):
+    import json
+
+    total, batches = export_batches(db, archived, include_archive)
+    exported = 0
+
+    with open(path, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as file:
+        for rows in batches:
+            if is_cancelled is not None and is_cancelled():
+                break
+
+            file.writelines(
+                json.dumps(export_record(Task.from_row(None, row)), ensure_ascii=False) + '\n' for row in rows
+            )
+            exported += len(rows)
+
+            if progress is not None:
+                progress(exported, total)
+
+    return exported
+
+
+def export_tasks(db, path, progress=None, is_cancelled=None, archived=False, include_archive=False):
+    if path.lower().endswith(('.jsonl', '.json')):
+        return export_tasks_jsonl(db, path, progress, is_cancelled, archived, include_archive)
+    return export_tasks_csv(db, path, progress, is_cancelled, archived, include_archive)
+
+
+ImportResult = namedtuple('ImportResult', ['imported', 'rejected_count', 'rejected', 'cancelled'])
+
+
+def parse_completed_flag(value):
+    if isinstance(value, str):
+        return value.strip().lower() in COMPLETED_VALUES
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        return value != 0
+    return False
+
+
+def record_fields(record):
+    for field in IMPORT_TEXT_FIELDS:
+        value = record.get(field)
+        if value is not None and not isinstance(value, str):
+            return None, f"{field} должен быть строкой"
+
+    tags = record.get('tags')
+    if tags is not None and not isinstance(tags, str) and \
+            not (isinstance(tags, (list, tuple)) and all(isinstance(tag, str) for tag in tags)):
+        return None, "tags должен быть строкой или списком строк"
+
+    return tuple(map(record.get, IMPORT_RECORD_FIELDS)), None
+
+
+def iter_import_records(file, path):
+    import csv
+    import json
+
+    if path.lower().endswith(('.jsonl', '.json')):
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                yield line_number, None, f"некорректный JSON: {error}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, "ожидался JSON-объект"
+                continue
+            fields, error = record_fields(record)
+            yield line_number, fields, error
+    else:
+        from operator import itemgetter
+
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        width = len(header)
+        columns = {}
+        for index, name in enumerate(header):
+            columns.setdefault(IMPORT_FIELDS.get(name.strip()), index)
+        get_fields = itemgetter(*(columns.get(field, width) for field in IMPORT_RECORD_FIELDS))
+
+        for line_number, row in enumerate(reader, start=2):
+            if len(row) != width:
+                row = row[:width] + [None] * (width - len(row))
+            row.append(None)
+            yield line_number, get_fields(row), None
+
+
+def validate_import_fields(fields, now):
+    title, description, deadline, date_of_creation, completed, completed_at, tags = fields
+
+    title = title.strip() if title else ''
+    if not title:
+        return None, "пустое название"
+
+    deadline_ts = parse_text_datetime(deadline)
+    if deadline_ts is None:
+        return None, f"некорректный дедлайн: {deadline!r}"
+
+    date_of_creation_ts = now
+    if date_of_creation:
+        date_of_creation_ts = parse_text_datetime(date_of_creation)
+        if date_of_creation_ts is None:
+            return None, f"некорректная дата создания: {date_of_creation!r}"
+
+    completed_at_ts = None
+    if completed and parse_completed_flag(completed):
+        completed_at_ts = now
+        if completed_at:
+            completed_at_ts = parse_text_datetime(completed_at)
+            if completed_at_ts is None:
+                return None, f"некорректная дата выполнения: {completed_at!r}"
+
+    if not tags:
+        tags = ()
+    else:
+        if isinstance(tags, str):
+            tags = tags.split(',')
+        tags = tuple(tag for tag in map(str.strip, tags) if tag)
+
+    return (title, description.strip() if description else '', deadline_ts, date_of_creation_ts,
+            0 if completed_at_ts is None else 1, completed_at_ts, tags), None
+
+
+def validate_import_record(record, now):
+    fields, error = record_fields(record)
+    if error is not None:
+        return None, error
+    return validate_import_fields(fields, now)
+
+
+def import_tasks(db, path, progress=None, is_cancelled=None):
+    now = current_timestamp()
+    total = os.path.getsize(path)
+    imported = 0
+    rejected_count = 0
+    rejected = []
+    batch = []
+    cancelled = False
+
+    with open(path, newline='', encoding='utf-8-sig', buffering=EXPORT_BUFFER_SIZE) as file:
+        for line_number, fields, error in iter_import_records(file, path):
+            if is_cancelled is not None and line_number % IMPORT_CANCEL_CHECK_LINES == 0 and is_cancelled():
+                cancelled = True
+                break
+
+            if error is None:
+                task_row, error = validate_import_fields(fields, now)
+
+            if error is not None:
+                rejected_count += 1
+                if len(rejected) < IMPORT_REJECTED_LIMIT:
+                    rejected.append((line_number, error))
+                continue
+
+            batch.append(task_row)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                imported += db.bulk_insert_tasks(batch)
+                batch = []
+                if progress is not None:
+                    progress(file.buffer.tell(), total)
+        else:
+            if batch:
+                imported += db.bulk_insert_tasks(batch)
+            if progress is not None:
+                progress(total, total)
+
+    return ImportResult(imported, rejected_count, rejected, cancelled)
@@ -1,152 +1,524 @@
+import heapq
+import os
 import sys
 import sqlite3
+import time
+from collections import OrderedDict
+
+STARTUP_STARTED = time.perf_counter()
+
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
-                             QHBoxLayout, QTabWidget, QPushButton, QListWidget,
-                             QListWidgetItem, QDialog, QLabel, QLineEdit,
-                             QTextEdit, QDialogButtonBox, QMessageBox, QDateTimeEdit
+                             QHBoxLayout, QTabWidget, QPushButton, QListView, QListWidget,
+                             QListWidgetItem, QDialog, QLabel, QLineEdit, QStyle, QStyledItemDelegate,
+                             QFileDialog, QProgressBar, QCheckBox, QSystemTrayIcon,
+                             QTextEdit, QDialogButtonBox, QMessageBox, QDateTimeEdit, QSpinBox
                              )
-from PyQt6.QtCore import Qt, QDateTime
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import (Qt, QDateTime, QAbstractListModel, QModelIndex, QObject, QRect, QRectF,
+                          QPoint, QRunnable, QSize, QThread, QThreadPool, QTimer, QEvent, pyqtSignal, pyqtSlot)
+from PyQt6.QtGui import (QFont, QFontMetrics, QColor, QImage, QImageReader, QPainter, QPalette, QPen, QPixmap,
+                         QTextLayout, QTextOption)
+
+from todo_core import (SEARCH_RESULTS_LIMIT, TASKS_PAGE_SIZE, DatabaseManager, Task, TaskCollection, export_tasks_csv,
+                       import_tasks, is_overdue, tag_key)
+
+
+DATETIME_FORMAT = "dd.MM.yyyy HH:mm"
+SEARCH_DEBOUNCE_MS = 250
+DATA_VERSION_POLL_MS = 1000
+RELOAD_WINDOW_SIZE = 5 * TASKS_PAGE_SIZE
+MAINTENANCE_INTERVAL_MS = 10 * 60 * 1000
+ARCHIVE_MAX_DAYS = 3650
+ATTACHMENTS_DIR = "attachments"
+THUMBNAIL_SIZE = 48
+THUMBNAIL_CACHE_SIZE = 300
+THUMBNAIL_DISK_LIMIT = 64 * 1024 * 1024
+THUMBNAIL_PRUNE_EVERY = 200
+DEADLINE_TIMER_MAX_MS = 60 * 60 * 1000
+REMINDER_WINDOW_SECONDS = 60 * 60
+REMINDER_OFFSET_CHOICES = ((10 * 60, "10 минут"), (60 * 60, "1 час"), (24 * 60 * 60, "1 день"),
+                           (7 * 24 * 60 * 60, "1 неделю"))
+BUTTON_COLORS = {
+    'create': ("#4CAF50", "#45a049"),
+    'edit': ("#2196F3", "#0b7dda"),
+    'complete': ("#FF9800", "#F57C00"),
+    'uncomplete': ("#9C27B0", "#7B1FA2"),
+    'delete': ("#f44336", "#d32f2f"),
+    'clear': ("#607D8B", "#455A64"),
+}
+THEME_STYLESHEET = """
+    QMainWindow {
+        background-color: #f0f0f0;
+    }
+    QTabWidget::pane {
+        border: 1px solid #C2C7CB;
+        background-color: white;
+    }
+    QTabBar::tab {
+        background-color: #E1E1E1;
+        border: 1px solid #C4C4C3;
+        padding: 8px 20px;
+    }
+    QTabBar::tab:selected {
+        background-color: white;
+        border-bottom-color: white;
+    }
+    QPushButton[role] {
+        color: white;
+        border: none;
+        padding: 8px 16px;
+        font-size: 14px;
+        border-radius: 5px;
+    }
+    QListView#tasks_list {
+        border: 1px solid #ccc;
+        border-radius: 5px;
+        background-color: white;
+    }
+""" + "".join(f"""
+    QPushButton[role="{role}"] {{
+        background-color: {color};
+    }}
+    QPushButton[role="{role}"]:hover {{
+        background-color: {hover_color};
+    }}
+""" for role, (color, hover_color) in BUTTON_COLORS.items())
+TASK_CARD_COLORS = {
+    'completed': ("#4CAF50", "#f8fff8", 2),
+    'overdue': ("#f44336", "#fff5f5", 2),
+    'hovered': ("#999", "#e9e9e9", 1),
+    'normal': ("#ccc", "#f9f9f9", 1),
+}
+TASK_TEXT_COLORS = {
+    'selection': "#e3f2fd",
+    'selection_border': "#2196F3",
+    'thumbnail_placeholder': "#e0e0e0",
+    'meta': "#666",
+    'overdue': "#f44336",
+    'completed_title': "#888",
+    'completed': "#4CAF50",
+    'tags': "#2196F3",
+    'description': "#555",
+}
+
+
+def format_timestamp(timestamp):
+    if timestamp is None:
+        return ''
+    return QDateTime.fromSecsSinceEpoch(timestamp).toString(DATETIME_FORMAT)
+
+
+class CsvExportThread(QThread):
+    progress = pyqtSignal(int, int)
+    finished_export = pyqtSignal(int)
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, db_name, path, include_archive, parent=None):
+        super().__init__(parent)
+        self.db_name = db_name
+        self.path = path
+        self.include_archive = include_archive
+
+    def run(self):
+        db = None
+        try:
+            db = DatabaseManager(self.db_name)
+            exported = export_tasks_csv(db, self.path, self.progress.emit, self.isInterruptionRequested,
+                                        include_archive=self.include_archive)
+        except (OSError, sqlite3.Error) as error:
+            self.failed.emit(str(error))
+            return
+        finally:
+            if db is not None:
+                db.close()
+
+        if self.isInterruptionRequested():
+            os.remove(self.path)
+            self.cancelled.emit()
+        else:
+            self.finished_export.emit(exported)
 
 
-class DatabaseManager:
-    def __init__(self, db_name="todo_app.db"):
+class ImportThread(QThread):
+    progress = pyqtSignal(int, int)
+    finished_import = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, db_name, path, parent=None):
+        super().__init__(parent)
         self.db_name = db_name
-        self.init_database()
-
-    def init_database(self):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                deadline TEXT NOT NULL,
-                date_of_creation TEXT NOT NULL,
-                completed BOOLEAN DEFAULT 0,
-                completed_at TEXT
-            )
-        ''')
-
-        conn.commit()
-        conn.close()
-
-    def get_all_tasks(self):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT * FROM tasks ORDER BY completed, deadline')
-
-        tasks = []
-        for row in cursor.fetchall():
-            task = {
-                'id': row[0],
-                'title': row[1],
-                'description': row[2],
-                'deadline': row[3],
-                'date_of_creation': row[4],
-                'completed': bool(row[5]),
-                'completed_at': row[6]
-            }
-            tasks.append(task)
-
-        conn.close()
-        return tasks
-
-    def add_task(self, task_data):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            INSERT INTO tasks (title, description, deadline, date_of_creation, completed)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            task_data['title'],
-            task_data['description'],
-            task_data['deadline'],
-            task_data['date_of_creation'],
-            0
-        ))
+        self.path = path
 
-        conn.commit()
-        task_id = cursor.lastrowid
-        conn.close()
-
-        return task_id
-
-    def update_task(self, task_id, task_data):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            UPDATE tasks 
-            SET title = ?, description = ?, deadline = ?, date_of_creation = ?
-            WHERE id = ?
-        ''', (
-            task_data['title'],
-            task_data['description'],
-            task_data['deadline'],
-            task_data['date_of_creation'],
-            task_id
-        ))
+    def run(self):
+        import csv
+
+        db = None
+        try:
+            db = DatabaseManager(self.db_name)
+            result = import_tasks(db, self.path, self.progress.emit, self.isInterruptionRequested)
+        except (OSError, UnicodeDecodeError, csv.Error, sqlite3.Error) as error:
+            self.failed.emit(str(error))
+            return
+        finally:
+            if db is not None:
+                db.close()
+
+        self.finished_import.emit(result)
+
+
+class DatabaseWorker(QObject):
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+    def __init__(self, db_name):
+        super().__init__()
+        self.db_name = db_name
+        self.db = None
+
+    @pyqtSlot(int, str, object)
+    def run(self, request_id, method_name, args):
+        try:
+            if self.db is None:
+                self.db = DatabaseManager(self.db_name)
+            result = getattr(self.db, method_name)(*args)
+        except sqlite3.Error as error:
+            self.failed.emit(request_id, str(error))
+        except Exception as error:
+            import traceback
+
+            traceback.print_exc()
+            self.failed.emit(request_id, f"{type(error).__name__}: {error}")
+        else:
+            self.finished.emit(request_id, result)
+
+    @pyqtSlot()
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+        self.thread().quit()
+
+
+class DatabaseClient(QObject):
+    requested = pyqtSignal(int, str, object)
+    close_requested = pyqtSignal()
+
+    def __init__(self, db_name="todo_app.db", parent=None):
+        super().__init__(parent)
+        self.db_name = db_name
+        self.callbacks = {}
+        self.last_request_id = 0
+
+        self.worker_thread = QThread()
+        self.worker = DatabaseWorker(db_name)
+        self.worker.moveToThread(self.worker_thread)
+
+        self.requested.connect(self.worker.run)
+        self.close_requested.connect(self.worker.close)
+        self.worker.finished.connect(self.on_finished)
+        self.worker.failed.connect(self.on_failed)
+
+        self.worker_thread.start()
+
+    def submit(self, method_name, *args, on_success=None, on_error=None):
+        self.last_request_id += 1
+        self.callbacks[self.last_request_id] = (on_success, on_error)
+        self.requested.emit(self.last_request_id, method_name, args)
+        return self.last_request_id
+
+    def on_finished(self, request_id, result):
+        on_success, on_error = self.callbacks.pop(request_id)
+        if on_success is not None:
+            on_success(result)
+
+    def on_failed(self, request_id, message):
+        on_success, on_error = self.callbacks.pop(request_id)
+        if on_error is not None:
+            on_error(message)
+
+    def close(self):
+        self.close_requested.emit()
+        self.worker_thread.wait()
+
+
+class AttachmentStore:
+    def __init__(self, directory=ATTACHMENTS_DIR):
+        self.directory = directory
+
+    def path_for(self, name):
+        return os.path.join(self.directory, name[:2], name)
+
+    def thumbnails_directory(self):
+        return os.path.join(self.directory, 'thumbnails')
+
+    def thumbnail_path_for(self, name, size):
+        return os.path.join(self.thumbnails_directory(), f"{os.path.splitext(name)[0]}_{size}.png")
+
+    def prune_thumbnails(self, limit):
+        try:
+            entries = []
+            with os.scandir(self.thumbnails_directory()) as scanner:
+                for entry in scanner:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            return 0
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+
+        return removed
+
+    def import_file(self, source_path):
+        import hashlib
+        import tempfile
+
+        os.makedirs(self.directory, exist_ok=True)
+        digest = hashlib.sha256()
+
+        fd, temp_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as target, open(source_path, 'rb') as source:
+                for chunk in iter(lambda: source.read(1024 * 1024), b''):
+                    digest.update(chunk)
+                    target.write(chunk)
+
+            name = digest.hexdigest() + os.path.splitext(source_path)[1].lower()
+            path = self.path_for(name)
+            if os.path.exists(path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return name
+
+
+class ThumbnailSignals(QObject):
+    loaded = pyqtSignal(str, QImage)
+    saved = pyqtSignal()
+
+
+class ThumbnailJob(QRunnable):
+    def __init__(self, store, name, size, signals):
+        super().__init__()
+        self.store = store
+        self.name = name
+        self.size = size
+        self.signals = signals
+
+    def run(self):
+        thumbnail_path = self.store.thumbnail_path_for(self.name, self.size)
+        image = QImage(thumbnail_path)
+
+        if not image.isNull():
+            try:
+                os.utime(thumbnail_path)
+            except OSError:
+                pass
+        else:
+            reader = QImageReader(self.store.path_for(self.name))
+            reader.setAutoTransform(True)
+            source_size = reader.size()
+            if source_size.isValid():
+                reader.setScaledSize(source_size.scaled(self.size, self.size, Qt.AspectRatioMode.KeepAspectRatio))
+            image = reader.read()
+
+            if not image.isNull():
+                os.makedirs(os.path.dirname(thumbnail_path), exist_ok=True)
+                if image.save(thumbnail_path, 'PNG'):
+                    self.signals.saved.emit()
+
+        self.signals.loaded.emit(self.name, image)
+
+
+class ThumbnailPruneJob(QRunnable):
+    def __init__(self, store, limit):
+        super().__init__()
+        self.store = store
+        self.limit = limit
+
+    def run(self):
+        self.store.prune_thumbnails(self.limit)
+
+
+class ThumbnailCache(QObject):
+    thumbnail_ready = pyqtSignal(str)
+
+    def __init__(self, store, size=THUMBNAIL_SIZE, capacity=THUMBNAIL_CACHE_SIZE, disk_limit=THUMBNAIL_DISK_LIMIT,
+                 parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.size = size
+        self.capacity = capacity
+        self.disk_limit = disk_limit
+        self.images = OrderedDict()
+        self.pending = set()
+        self.failed = set()
+        self.saved_since_prune = 0
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        self.signals = ThumbnailSignals(self)
+        self.signals.loaded.connect(self.on_loaded)
+        self.signals.saved.connect(self.on_saved)
+        self.prune()
+
+    def prune(self):
+        self.saved_since_prune = 0
+        self.pool.start(ThumbnailPruneJob(self.store, self.disk_limit))
+
+    def on_saved(self):
+        self.saved_since_prune += 1
+        if self.saved_since_prune >= THUMBNAIL_PRUNE_EVERY:
+            self.prune()
+
+    def get(self, name):
+        image = self.images.get(name)
+        if image is not None:
+            self.images.move_to_end(name)
+            return image
+
+        if name not in self.pending and name not in self.failed:
+            self.pending.add(name)
+            self.pool.start(ThumbnailJob(self.store, name, self.size, self.signals))
+        return None
+
+    def forget(self, name):
+        self.images.pop(name, None)
+        self.failed.discard(name)
+
+    def on_loaded(self, name, image):
+        self.pending.discard(name)
+        if image.isNull():
+            self.failed.add(name)
+            return
+
+        self.images[name] = image
+        while len(self.images) > self.capacity:
+            self.images.popitem(last=False)
+
+        self.thumbnail_ready.emit(name)
+
+
+class ImageViewerDialog(QDialog):
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Изображение")
+        self.setModal(True)
+
+        layout = QVBoxLayout()
+        image_label = QLabel()
+        image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        source_size = reader.size()
+        if source_size.isValid():
+            reader.setScaledSize(source_size.scaled(800, 600, Qt.AspectRatioMode.KeepAspectRatio)
+                                 if source_size.width() > 800 or source_size.height() > 600 else source_size)
+        image = reader.read()
+
+        if image.isNull():
+            image_label.setText("Не удалось открыть изображение")
+        else:
+            image_label.setPixmap(QPixmap.fromImage(image))
+
+        layout.addWidget(image_label)
+        self.setLayout(layout)
 
-        conn.commit()
-        conn.close()
 
-    def delete_task(self, task_id):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+class TagPickerDialog(QDialog):
+    def __init__(self, parent=None, available_tags=(), selected_tags=()):
+        super().__init__(parent)
+        self.setWindowTitle("Выбрать теги")
+        self.setModal(True)
+        self.resize(300, 350)
 
-        cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+        self.init_ui()
 
-        conn.commit()
-        conn.close()
+        selected_tags = set(selected_tags)
+        for name in sorted(set(available_tags) | selected_tags, key=tag_key):
+            self.add_tag_item(name, name in selected_tags)
 
-    def complete_task(self, task_id):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+    def init_ui(self):
+        layout = QVBoxLayout()
 
-        completed_at = QDateTime.currentDateTime().toString("dd.MM.yyyy HH:mm")
+        self.tags_list = QListWidget()
 
-        cursor.execute('''
-            UPDATE tasks 
-            SET completed = 1, completed_at = ?
-            WHERE id = ?
-        ''', (completed_at, task_id))
+        new_tag_layout = QHBoxLayout()
+        self.new_tag_input = QLineEdit()
+        self.new_tag_input.setPlaceholderText("Новый тег")
+        self.new_tag_input.returnPressed.connect(self.create_tag)
+        create_tag_btn = QPushButton("Создать тег")
+        create_tag_btn.setAutoDefault(False)
+        create_tag_btn.clicked.connect(self.create_tag)
+        new_tag_layout.addWidget(self.new_tag_input)
+        new_tag_layout.addWidget(create_tag_btn)
 
-        conn.commit()
-        conn.close()
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok |
+                                      QDialogButtonBox.StandardButton.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
 
-    def uncomplete_task(self, task_id):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        layout.addWidget(self.tags_list)
+        layout.addLayout(new_tag_layout)
+        layout.addWidget(button_box)
 
-        cursor.execute('''
-            UPDATE tasks 
-            SET completed = 0, completed_at = NULL
-            WHERE id = ?
-        ''', (task_id,))
+        self.setLayout(layout)
 
-        conn.commit()
-        conn.close()
+    def add_tag_item(self, name, checked):
+        item = QListWidgetItem(name, self.tags_list)
+        item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+        item.setCheckState(Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked)
+        return item
 
-    def clear_completed_tasks(self):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+    def create_tag(self):
+        name = self.new_tag_input.text().strip()
+        if not name:
+            return
 
-        cursor.execute('DELETE FROM tasks WHERE completed = 1')
+        for row in range(self.tags_list.count()):
+            item = self.tags_list.item(row)
+            if tag_key(item.text()) == tag_key(name):
+                item.setCheckState(Qt.CheckState.Checked)
+                break
+        else:
+            self.add_tag_item(name, True)
 
-        conn.commit()
-        conn.close()
+        self.new_tag_input.clear()
+
+    def selected_tags(self):
+        return tuple(sorted(
+            self.tags_list.item(row).text()
+            for row in range(self.tags_list.count())
+            if self.tags_list.item(row).checkState() == Qt.CheckState.Checked
+        ))
 
 
 class TaskDialog(QDialog):
-    def __init__(self, parent=None, task_data=None):
+    def __init__(self, parent=None, task_data=None, available_tags=()):
         super().__init__(parent)
         self.task_data = task_data
         self.is_edit_mode = task_data is not None
+        self.available_tags = available_tags
+        self.selected_tags = task_data.get('tags', ()) if task_data else ()
+        self.image = task_data.get('image') if task_data else None
+        self.image_source = None
 
         title = "Редактировать задачу" if self.is_edit_mode else "Новая задача"
         self.setWindowTitle(title)
@@ -185,6 +557,33 @@ class TaskDialog(QDialog):
         deadline_layout.addWidget(deadline_label)
         deadline_layout.addWidget(self.deadline_input)
 
+        tags_layout = QHBoxLayout()
+        tags_label = QLabel("Теги:")
+        self.tags_value_label = QLabel()
+        self.tags_value_label.setWordWrap(True)
+        self.choose_tags_btn = QPushButton("Выбрать теги")
+        self.choose_tags_btn.setAutoDefault(False)
+        self.choose_tags_btn.clicked.connect(self.choose_tags)
+        tags_layout.addWidget(tags_label)
+        tags_layout.addWidget(self.tags_value_label, 1)
+        tags_layout.addWidget(self.choose_tags_btn)
+        self.update_tags_label()
+
+        image_layout = QHBoxLayout()
+        image_label = QLabel("Картинка:")
+        self.image_value_label = QLabel()
+        self.choose_image_btn = QPushButton("Прикрепить картинку")
+        self.choose_image_btn.setAutoDefault(False)
+        self.choose_image_btn.clicked.connect(self.choose_image)
+        self.remove_image_btn = QPushButton("Убрать")
+        self.remove_image_btn.setAutoDefault(False)
+        self.remove_image_btn.clicked.connect(self.remove_image)
+        image_layout.addWidget(image_label)
+        image_layout.addWidget(self.image_value_label, 1)
+        image_layout.addWidget(self.choose_image_btn)
+        image_layout.addWidget(self.remove_image_btn)
+        self.update_image_label()
+
         button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok |
                                       QDialogButtonBox.StandardButton.Cancel)
         button_box.accepted.connect(self.validate_and_accept)
@@ -193,6 +592,8 @@ class TaskDialog(QDialog):
         layout.addLayout(title_layout)
         layout.addLayout(desc_layout)
         layout.addLayout(deadline_layout)
+        layout.addLayout(tags_layout)
+        layout.addLayout(image_layout)
         layout.addWidget(button_box)
 
         self.setLayout(layout)
@@ -201,10 +602,40 @@ class TaskDialog(QDialog):
         self.title_input.setText(self.task_data['title'])
         self.desc_input.setPlainText(self.task_data['description'])
 
-        datetime_str = self.task_data['deadline']
-        datetime = QDateTime.fromString(datetime_str, "dd.MM.yyyy HH:mm")
-        if datetime.isValid():
-            self.deadline_input.setDateTime(datetime)
+        deadline = QDateTime.fromSecsSinceEpoch(self.task_data['deadline'])
+        if deadline.isValid():
+            self.deadline_input.setDateTime(deadline)
+
+    def choose_tags(self):
+        dialog = TagPickerDialog(self, self.available_tags, self.selected_tags)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.selected_tags = dialog.selected_tags()
+            self.update_tags_label()
+
+    def update_tags_label(self):
+        self.tags_value_label.setText(", ".join(self.selected_tags) or "Нет тегов")
+
+    def choose_image(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Выбрать картинку", "",
+                                              "Изображения (*.png *.jpg *.jpeg *.bmp *.gif)")
+        if path:
+            self.image_source = path
+            self.update_image_label()
+
+    def remove_image(self):
+        self.image = None
+        self.image_source = None
+        self.update_image_label()
+
+    def update_image_label(self):
+        if self.image_source:
+            text = os.path.basename(self.image_source)
+        elif self.image:
+            text = "Прикреплена"
+        else:
+            text = "Нет картинки"
+        self.image_value_label.setText(text)
+        self.remove_image_btn.setEnabled(bool(self.image or self.image_source))
 
     def validate_and_accept(self):
         if not self.title_input.text().strip():
@@ -217,86 +648,533 @@ class TaskDialog(QDialog):
         data = {
             'title': self.title_input.text().strip(),
             'description': self.desc_input.toPlainText().strip(),
-            'deadline': self.deadline_input.dateTime().toString("dd.MM.yyyy HH:mm"),
+            'deadline': self.deadline_input.dateTime().toSecsSinceEpoch(),
+            'tags': self.selected_tags,
+            'image': self.image,
         }
 
+        if self.image_source:
+            data['image_source'] = self.image_source
+
         if self.is_edit_mode:
             data['date_of_creation'] = self.task_data['date_of_creation']
         else:
-            data['date_of_creation'] = QDateTime.currentDateTime().toString("dd.MM.yyyy HH:mm")
+            data['date_of_creation'] = QDateTime.currentSecsSinceEpoch()
 
         return data
 
 
-class TaskItemWidget(QWidget):
-    def __init__(self, task_data, parent=None):
+class DeadlineScheduler(QObject):
+    def __init__(self, tasks, parent=None):
         super().__init__(parent)
-        self.task_data = task_data
-        self.init_ui()
-        self.update_appearance()
+        self.tasks = tasks
+        self.tasks.add_listener(self)
+        self.heap = []
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.on_timeout)
+
+        self.rebuild()
+
+    def before_change(self, change):
+        pass
+
+    def after_change(self, change):
+        if change.kind in ('reset', 'layout'):
+            self.rebuild()
+        elif change.kind == 'insert':
+            self.track(self.tasks.tasks[change.first:change.last + 1])
+        elif change.kind == 'update':
+            self.track([self.tasks[change.first]])
+        elif change.kind == 'move':
+            self.track([self.tasks[change.destination]])
+
+    def rebuild(self):
+        now = QDateTime.currentSecsSinceEpoch()
+        entries = (self.flag(task_data, now) for task_data in self.tasks)
+        self.heap = [entry for entry in entries if entry]
+        heapq.heapify(self.heap)
+        self.arm(now)
+
+    def track(self, tasks):
+        now = QDateTime.currentSecsSinceEpoch()
+        for task_data in tasks:
+            entry = self.flag(task_data, now)
+            if entry:
+                heapq.heappush(self.heap, entry)
+        self.arm(now)
+
+    @staticmethod
+    def flag(task_data, now):
+        task_data['overdue'] = is_overdue(task_data, now)
+        if task_data['completed'] or task_data['overdue']:
+            return None
+        return task_data['deadline'], task_data['id']
+
+    def arm(self, now):
+        if not self.heap:
+            self.timer.stop()
+            return
 
-    def init_ui(self):
-        layout = QVBoxLayout()
-        layout.setContentsMargins(10, 5, 10, 5)
+        delay = (self.heap[0][0] - now) * 1000
+        self.timer.start(max(0, min(delay, DEADLINE_TIMER_MAX_MS)))
+
+    def on_timeout(self):
+        now = QDateTime.currentSecsSinceEpoch()
 
-        top_layout = QHBoxLayout()
+        due = {}
+        while self.heap and self.heap[0][0] <= now:
+            deadline, task_id = heapq.heappop(self.heap)
+            task_data = self.tasks.get(task_id)
+            if task_data is not None and task_data['deadline'] == deadline and not task_data['overdue'] \
+                    and not task_data['completed']:
+                due[task_id] = deadline
 
-        self.title_label = QLabel(self.task_data['title'])
-        self.title_label.setFont(QFont("Arial", 10, QFont.Weight.Bold))
+        for task_id in due:
+            self.tasks.update(task_id, {})
 
-        self.create_label = QLabel(f"Создан: {self.task_data['date_of_creation']}")
-        self.create_label.setStyleSheet("color: #666; font-size: 14px;")
+        self.arm(now)
 
-        self.deadline_label = QLabel(f"До: {self.task_data['deadline']}")
-        self.deadline_label.setStyleSheet("color: #666; font-size: 14px;")
 
-        top_layout.addWidget(self.title_label, 1)
-        top_layout.addWidget(self.create_label)
-        top_layout.addWidget(self.deadline_label)
+class ReminderScheduler(QObject):
+    reminders_due = pyqtSignal(list)
 
-        if self.task_data.get('completed', False):
-            self.completed_label = QLabel(f"Выполнено: {self.task_data.get('completed_at', '')}")
-            self.completed_label.setStyleSheet("color: #4CAF50; font-size: 12px; font-weight: bold;")
-            layout.addLayout(top_layout)
-            layout.addWidget(self.completed_label)
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.offsets = ()
+        self.heap = []
+        self.cursor = QDateTime.currentSecsSinceEpoch()
+        self.window_end = self.cursor
+        self.version = 0
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.on_timeout)
+
+    def set_offsets(self, offsets):
+        self.offsets = tuple(sorted(set(offsets)))
+        self.invalidate()
+
+    def invalidate(self):
+        self.load_window(self.cursor)
+
+    def load_window(self, start):
+        self.version += 1
+        version = self.version
+        end = max(start, QDateTime.currentSecsSinceEpoch()) + REMINDER_WINDOW_SECONDS
+
+        if not self.offsets:
+            self.on_window_loaded([], end, version)
+            return
+        self.db.submit('get_reminders', start, end, self.offsets,
+                       on_success=lambda reminders: self.on_window_loaded(reminders, end, version))
+
+    def on_window_loaded(self, reminders, end, version):
+        if version != self.version:
+            return
+
+        self.heap = [reminder for reminder in reminders if reminder[0] >= self.cursor]
+        heapq.heapify(self.heap)
+        self.window_end = end
+        self.arm()
+
+    def arm(self):
+        next_instant = min(self.heap[0][0], self.window_end) if self.heap else self.window_end
+        delay = (next_instant - QDateTime.currentSecsSinceEpoch()) * 1000
+        self.timer.start(max(0, min(delay, DEADLINE_TIMER_MAX_MS)))
+
+    def on_timeout(self):
+        now = QDateTime.currentSecsSinceEpoch()
+
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            due.append(heapq.heappop(self.heap))
+        if due:
+            self.cursor = now + 1
+            self.reminders_due.emit(due)
+
+        if now >= self.window_end:
+            self.cursor = max(self.cursor, self.window_end)
+            self.load_window(self.cursor)
         else:
-            layout.addLayout(top_layout)
+            self.arm()
 
-        if self.task_data['description']:
-            self.desc_label = QLabel(self.task_data['description'])
-            self.desc_label.setStyleSheet("color: #555; font-size: 13px; margin-top: 2px;")
-            self.desc_label.setWordWrap(True)
-            self.desc_label.setMaximumHeight(40)
-            layout.addWidget(self.desc_label)
 
-        self.setLayout(layout)
-        self.update_appearance()
-
-    def update_appearance(self):
-        if self.task_data.get('completed', False):
-            self.setStyleSheet("""
-                TaskItemWidget {
-                    border: 2px solid #4CAF50;
-                    border-radius: 5px;
-                    background-color: #f8fff8;
-                    margin: 2px;
-                }
-            """)
-            self.title_label.setStyleSheet("text-decoration: line-through; color: #888;")
+class TaskListModel(QAbstractListModel):
+    TaskRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, tasks, page_loader=None, parent=None):
+        super().__init__(parent)
+        self.tasks = tasks
+        self.tasks.add_listener(self)
+        self.page_loader = page_loader
+        self.fetching = False
+        self.persistent_task_ids = []
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.tasks)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        task_data = self.tasks[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return task_data['title']
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return task_data['description'] or None
+        if role == self.TaskRole:
+            return task_data
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.page_loader is None:
+            return False
+        return self.tasks.has_more and not self.fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+
+        self.fetching = True
+        version = self.tasks.version
+        after_key = self.tasks.keys[-1] if self.tasks.keys else None
+        self.page_loader(after_key, TASKS_PAGE_SIZE, lambda page: self.on_page_loaded(page, version))
+
+    def on_page_loaded(self, page, version):
+        self.fetching = False
+        if version != self.tasks.version:
+            self.fetchMore()
+            return
+
+        self.tasks.extend(page, len(page) == TASKS_PAGE_SIZE)
+
+    def before_change(self, change):
+        if change.kind == 'reset':
+            self.beginResetModel()
+        elif change.kind == 'insert':
+            self.beginInsertRows(QModelIndex(), change.first, change.last)
+        elif change.kind == 'remove':
+            self.beginRemoveRows(QModelIndex(), change.first, change.last)
+        elif change.kind == 'move':
+            destination = change.destination + 1 if change.destination > change.first else change.destination
+            self.beginMoveRows(QModelIndex(), change.first, change.last, QModelIndex(), destination)
+        elif change.kind == 'layout':
+            self.layoutAboutToBeChanged.emit()
+            self.persistent_task_ids = [
+                (index, self.tasks[index.row()]['id']) for index in self.persistentIndexList()
+            ]
+
+    def after_change(self, change):
+        if change.kind == 'reset':
+            self.endResetModel()
+        elif change.kind == 'insert':
+            self.endInsertRows()
+        elif change.kind == 'remove':
+            self.endRemoveRows()
+        elif change.kind == 'move':
+            self.endMoveRows()
+            row_index = self.index(change.destination)
+            self.dataChanged.emit(row_index, row_index)
+        elif change.kind == 'update':
+            first, last = self.index(change.first), self.index(change.last)
+            self.dataChanged.emit(first, last)
+        elif change.kind == 'layout':
+            old_indexes = [index for index, task_id in self.persistent_task_ids]
+            new_indexes = [self.index(self.tasks.row_of(task_id)) for index, task_id in self.persistent_task_ids]
+            self.changePersistentIndexList(old_indexes, new_indexes)
+            self.persistent_task_ids = []
+            self.layoutChanged.emit()
+
+
+class TaskItemDelegate(QStyledItemDelegate):
+    CARD_MARGIN = 2
+    PADDING_X = 10
+    PADDING_Y = 5
+    SPACING = 6
+    DESCRIPTION_MAX_HEIGHT = 40
+    SIZE_CACHE_LIMIT = 50000
+
+    image_clicked = pyqtSignal(str)
+
+    def __init__(self, thumbnails=None, parent=None):
+        super().__init__(parent)
+        self.thumbnails = thumbnails
+        if thumbnails is not None:
+            thumbnails.thumbnail_ready.connect(self.on_thumbnail_ready)
+
+        self.title_font = QFont("Arial", 10, QFont.Weight.Bold)
+        self.completed_title_font = QFont(self.title_font)
+        self.completed_title_font.setStrikeOut(True)
+
+        self.meta_font = QFont()
+        self.meta_font.setPixelSize(14)
+
+        self.completed_font = QFont()
+        self.completed_font.setPixelSize(12)
+        self.completed_font.setBold(True)
+
+        self.tags_font = QFont()
+        self.tags_font.setPixelSize(12)
+
+        self.description_font = QFont()
+        self.description_font.setPixelSize(13)
+
+        self.title_metrics = QFontMetrics(self.title_font)
+        self.meta_metrics = QFontMetrics(self.meta_font)
+        self.completed_metrics = QFontMetrics(self.completed_font)
+        self.tags_metrics = QFontMetrics(self.tags_font)
+        self.description_metrics = QFontMetrics(self.description_font)
+
+        self.top_line_height = max(self.title_metrics.height(), self.meta_metrics.height())
+        self.description_max_lines = max(1, self.DESCRIPTION_MAX_HEIGHT // self.description_metrics.lineSpacing())
+
+        self.size_cache = {}
+        self.size_cache_width = None
+
+        self.card_styles = {
+            state: (QPen(QColor(border_color), border_width), QColor(background_color), border_width / 2)
+            for state, (border_color, background_color, border_width) in TASK_CARD_COLORS.items()
+        }
+        self.colors = {name: QColor(color) for name, color in TASK_TEXT_COLORS.items()}
+        self.selection_pen = QPen(self.colors['selection_border'], 1)
+
+    def content_width(self, width, has_image=False):
+        width -= 2 * (self.CARD_MARGIN + self.PADDING_X)
+        if has_image:
+            width -= THUMBNAIL_SIZE + self.SPACING
+        return width
+
+    def thumbnail_rect(self, rect):
+        return QRect(rect.left() + self.CARD_MARGIN + self.PADDING_X, rect.top() + self.CARD_MARGIN + self.PADDING_Y,
+                     THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+
+    def on_thumbnail_ready(self, name):
+        view = self.parent()
+        if view is not None:
+            view.viewport().update()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            task_data = index.data(TaskListModel.TaskRole)
+            if task_data['image'] and self.thumbnail_rect(option.rect).contains(event.position().toPoint()):
+                self.image_clicked.emit(task_data['image'])
+                return True
+        return super().editorEvent(event, model, option, index)
+
+    def description_lines(self, text, width):
+        lines = []
+        text_layout = QTextLayout(text, self.description_font)
+        option = QTextOption()
+        option.setWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
+        text_layout.setTextOption(option)
+
+        text_layout.beginLayout()
+        while len(lines) < self.description_max_lines:
+            line = text_layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(width)
+            lines.append((line.textStart(), line.textLength()))
+        has_more = text_layout.createLine().isValid()
+        text_layout.endLayout()
+
+        result = [text[start:start + length].rstrip('\n') for start, length in lines]
+        if has_more and result:
+            rest = text[lines[-1][0]:].replace('\n', ' ')
+            result[-1] = self.description_metrics.elidedText(rest, Qt.TextElideMode.ElideRight, width)
+        return result
+
+    def view_width(self, option):
+        view = self.parent()
+        if view is not None:
+            return view.viewport().width()
+        return option.rect.width()
+
+    def sizeHint(self, option, index):
+        task_data = index.data(TaskListModel.TaskRole)
+        width = self.view_width(option)
+
+        if width != self.size_cache_width or len(self.size_cache) > self.SIZE_CACHE_LIMIT:
+            self.size_cache.clear()
+            self.size_cache_width = width
+
+        has_image = bool(task_data['image'])
+        cache_key = (task_data['completed'], bool(task_data['tags']), has_image, task_data['description'])
+        height = self.size_cache.get(cache_key)
+        if height is None:
+            height = 2 * (self.CARD_MARGIN + self.PADDING_Y) + self.top_line_height
+            if task_data['completed']:
+                height += self.completed_metrics.height()
+            if task_data['tags']:
+                height += self.tags_metrics.height()
+            if task_data['description']:
+                lines = self.description_lines(task_data['description'], self.content_width(width, has_image))
+                height += 2 + len(lines) * self.description_metrics.lineSpacing()
+            if has_image:
+                height = max(height, 2 * (self.CARD_MARGIN + self.PADDING_Y) + THUMBNAIL_SIZE)
+            self.size_cache[cache_key] = height
+
+        return QSize(0, height)
+
+    def paint(self, painter, option, index):
+        task_data = index.data(TaskListModel.TaskRole)
+        completed = task_data['completed']
+        overdue = task_data.get('overdue', False)
+        selected = bool(option.state & QStyle.StateFlag.State_Selected)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        if selected:
+            painter.fillRect(option.rect, self.colors['selection'])
+            painter.setPen(self.selection_pen)
+            painter.drawRect(option.rect.adjusted(0, 0, -1, -1))
+
+        if completed:
+            state = 'completed'
+        elif overdue:
+            state = 'overdue'
+        elif hovered:
+            state = 'hovered'
         else:
-            self.setStyleSheet("""
-                TaskItemWidget {
-                    border: 1px solid #ccc;
-                    border-radius: 5px;
-                    background-color: #f9f9f9;
-                    margin: 2px;
-                }
-                TaskItemWidget:hover {
-                    background-color: #e9e9e9;
-                    border-color: #999;
-                }
-            """)
-            self.title_label.setStyleSheet("")
+            state = 'normal'
+        border_pen, background_color, half_border = self.card_styles[state]
+
+        card = QRectF(option.rect).adjusted(self.CARD_MARGIN, self.CARD_MARGIN,
+                                            -self.CARD_MARGIN, -self.CARD_MARGIN)
+        painter.setPen(border_pen)
+        painter.setBrush(background_color)
+        painter.drawRoundedRect(card.adjusted(half_border, half_border, -half_border, -half_border), 5, 5)
+
+        content = option.rect.adjusted(self.CARD_MARGIN + self.PADDING_X, self.CARD_MARGIN + self.PADDING_Y,
+                                       -self.CARD_MARGIN - self.PADDING_X, -self.CARD_MARGIN - self.PADDING_Y)
+        y = content.top()
+
+        if task_data['image']:
+            thumbnail_rect = self.thumbnail_rect(option.rect)
+            thumbnail = self.thumbnails.get(task_data['image']) if self.thumbnails is not None else None
+            if thumbnail is None:
+                painter.fillRect(thumbnail_rect, self.colors['thumbnail_placeholder'])
+            else:
+                target = QRect(QPoint(0, 0), thumbnail.size())
+                target.moveCenter(thumbnail_rect.center())
+                painter.drawImage(target, thumbnail)
+            content.setLeft(content.left() + THUMBNAIL_SIZE + self.SPACING)
+
+        archived_text = "В архиве · " if task_data['archived'] else ""
+        created_text = f"{archived_text}Создан: {format_timestamp(task_data['date_of_creation'])}"
+        deadline_text = f"{'Просрочено' if overdue else 'До'}: {format_timestamp(task_data['deadline'])}"
+        deadline_width = self.meta_metrics.horizontalAdvance(deadline_text)
+        created_width = self.meta_metrics.horizontalAdvance(created_text)
+
+        painter.setFont(self.meta_font)
+        painter.setPen(self.colors['overdue'] if overdue else self.colors['meta'])
+        top_line = QRect(content.left(), y, content.width(), self.top_line_height)
+        align = Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignRight
+        painter.drawText(top_line, align, deadline_text)
+        painter.setPen(self.colors['meta'])
+        painter.drawText(top_line.adjusted(0, 0, -deadline_width - self.SPACING, 0), align, created_text)
+
+        title_width = content.width() - deadline_width - created_width - 2 * self.SPACING
+        painter.setFont(self.completed_title_font if completed else self.title_font)
+        painter.setPen(self.colors['completed_title'] if completed else option.palette.color(QPalette.ColorRole.Text))
+        title = self.title_metrics.elidedText(task_data['title'], Qt.TextElideMode.ElideRight, max(0, title_width))
+        painter.drawText(QRect(content.left(), y, max(0, title_width), self.top_line_height),
+                         Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, title)
+        y += self.top_line_height
+
+        if completed:
+            painter.setFont(self.completed_font)
+            painter.setPen(self.colors['completed'])
+            painter.drawText(QRect(content.left(), y, content.width(), self.completed_metrics.height()),
+                             Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft,
+                             f"Выполнено: {format_timestamp(task_data['completed_at'])}")
+            y += self.completed_metrics.height()
+
+        if task_data['tags']:
+            painter.setFont(self.tags_font)
+            painter.setPen(self.colors['tags'])
+            tags_text = self.tags_metrics.elidedText(f"Теги: {', '.join(task_data['tags'])}",
+                                                     Qt.TextElideMode.ElideRight, content.width())
+            painter.drawText(QRect(content.left(), y, content.width(), self.tags_metrics.height()),
+                             Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, tags_text)
+            y += self.tags_metrics.height()
+
+        if task_data['description']:
+            y += 2
+            painter.setFont(self.description_font)
+            painter.setPen(self.colors['description'])
+            line_height = self.description_metrics.lineSpacing()
+            for line in self.description_lines(task_data['description'], content.width()):
+                painter.drawText(QRect(content.left(), y, content.width(), line_height),
+                                 Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, line)
+                y += line_height
+
+        painter.restore()
+
+
+class StartupProfiler(QObject):
+    def __init__(self, started, parent=None):
+        super().__init__(parent)
+        self.started = started
+        self.last = started
+        self.phases = []
+        self.window = None
+        self.painted = False
+        self.loaded = False
+        self.page_painted = False
+        self.timer = None
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last, now - self.started))
+        self.last = now
+
+    def watch(self, window):
+        self.window = window
+        window.tasks_model.rowsInserted.connect(self.on_rows_inserted)
+        window.tasks_list.viewport().installEventFilter(self)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check)
+        self.timer.start(1)
+
+    def on_rows_inserted(self):
+        self.window.tasks_model.rowsInserted.disconnect(self.on_rows_inserted)
+        self.loaded = True
+        self.mark("первая страница задач загружена")
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint:
+            if not self.painted:
+                self.painted = True
+                self.mark("первый кадр отрисован")
+            if self.loaded:
+                self.page_painted = True
+        return False
+
+    def check(self):
+        if not self.painted or self.window.tasks_model.fetching:
+            return
+        if self.window.tasks_model.rowCount() > 0 and not self.page_painted:
+            return
+
+        self.timer.stop()
+        self.window.tasks_list.viewport().removeEventFilter(self)
+        if not self.loaded:
+            self.window.tasks_model.rowsInserted.disconnect(self.on_rows_inserted)
+            self.mark("первая страница задач загружена")
+        self.mark("первая страница отрисована")
+
+        print("Профиль запуска:", file=sys.stderr)
+        for name, duration, elapsed in self.phases:
+            print(f"  {name:<36} {duration * 1000:8.1f} мс  (с начала {elapsed * 1000:8.1f} мс)", file=sys.stderr)
 
 
 class MainWindow(QMainWindow):
@@ -305,11 +1183,50 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("To-Do приложение")
         self.resize(700, 500)
 
-        self.db = DatabaseManager()
-
-        self.tasks = self.db.get_all_tasks()
+        self.db = DatabaseClient()
+        self.attachments = AttachmentStore()
+        self.thumbnails = ThumbnailCache(self.attachments, parent=self)
+
+        self.tasks = TaskCollection()
+        self.deadlines = DeadlineScheduler(self.tasks, self)
+        self.reminders = ReminderScheduler(self.db, self)
+        self.reminders.reminders_due.connect(self.show_reminders)
+        self.tray_icon = None
+        if QSystemTrayIcon.isSystemTrayAvailable():
+            self.tray_icon = QSystemTrayIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_MessageBoxInformation),
+                                             self)
+            self.tray_icon.show()
+        self.tags = []
+        self.tag_filter = ()
+        self.export_thread = None
+        self.import_thread = None
+        self.data_version = None
+        self.polling_data_version = False
+        self.data_version_timer = QTimer(self)
+        self.data_version_timer.timeout.connect(self.poll_data_version)
+        self.change_version = None
+        self.maintenance_timer = QTimer(self)
+        self.maintenance_timer.timeout.connect(self.maintain_database)
 
         self.init_ui()
+        self.poll_data_version()
+        self.db.submit('change_version', on_success=self.on_change_version)
+        self.tasks_model.fetchMore()
+        self.refresh_tags()
+        self.index_search_backlog()
+        self.db.submit('get_reminder_offsets', on_success=self.on_reminder_offsets_loaded)
+        self.db.submit('get_archive_after_days', on_success=self.on_archive_after_days_loaded)
+        self.maintain_database()
+        self.data_version_timer.start(DATA_VERSION_POLL_MS)
+        self.maintenance_timer.start(MAINTENANCE_INTERVAL_MS)
+
+    def closeEvent(self, event):
+        for thread in (self.export_thread, self.import_thread):
+            if thread is not None and thread.isRunning():
+                thread.requestInterruption()
+                thread.wait()
+        self.db.close()
+        super().closeEvent(event)
 
     def init_ui(self):
         central_widget = QWidget()
@@ -334,103 +1251,36 @@ class MainWindow(QMainWindow):
     def setup_tasks_tab(self):
         layout = QVBoxLayout()
 
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search_tasks)
+
         buttons_layout = QHBoxLayout()
 
         self.create_task_btn = QPushButton("Создать задачу")
         self.create_task_btn.clicked.connect(self.create_task)
-        self.create_task_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                font-size: 14px;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-        """)
+        self.create_task_btn.setProperty("role", "create")
 
         self.edit_task_btn = QPushButton("Редактировать задачу")
         self.edit_task_btn.clicked.connect(self.edit_task)
-        self.edit_task_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #2196F3;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                font-size: 14px;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #0b7dda;
-            }
-        """)
+        self.edit_task_btn.setProperty("role", "edit")
 
         self.complete_task_btn = QPushButton("Выполнить задачу")
         self.complete_task_btn.clicked.connect(self.complete_task)
-        self.complete_task_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #FF9800;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                font-size: 14px;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #F57C00;
-            }
-        """)
+        self.complete_task_btn.setProperty("role", "complete")
 
         self.uncomplete_task_btn = QPushButton("Вернуть в работу")
         self.uncomplete_task_btn.clicked.connect(self.uncomplete_task)
-        self.uncomplete_task_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #9C27B0;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                font-size: 14px;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #7B1FA2;
-            }
-        """)
+        self.uncomplete_task_btn.setProperty("role", "uncomplete")
 
         self.delete_task_btn = QPushButton("Удалить задачу")
         self.delete_task_btn.clicked.connect(self.delete_task)
-        self.delete_task_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f44336;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                font-size: 14px;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #d32f2f;
-            }
-        """)
+        self.delete_task_btn.setProperty("role", "delete")
 
         self.clear_completed_btn = QPushButton("Очистить выполненные")
         self.clear_completed_btn.clicked.connect(self.clear_completed)
-        self.clear_completed_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #607D8B;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                font-size: 14px;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #455A64;
-            }
-        """)
+        self.clear_completed_btn.setProperty("role", "clear")
 
         buttons_layout.addWidget(self.create_task_btn)
         buttons_layout.addWidget(self.edit_task_btn)
@@ -440,27 +1290,49 @@ class MainWindow(QMainWindow):
         buttons_layout.addWidget(self.clear_completed_btn)
         buttons_layout.addStretch()
 
-        self.tasks_list = QListWidget()
-        self.tasks_list.setStyleSheet("""
-            QListWidget {
-                border: 1px solid #ccc;
-                border-radius: 5px;
-                background-color: white;
-            }
-            QListWidget::item:selected {
-                background-color: #e3f2fd;
-                border: 1px solid #2196F3;
-            }
-        """)
-        self.tasks_list.itemDoubleClicked.connect(self.edit_task)
+        self.tasks_model = TaskListModel(self.tasks, self.load_tasks_page, self)
+
+        self.tasks_list = QListView()
+        self.tasks_list.setModel(self.tasks_model)
+        self.tasks_list.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
+        self.tasks_delegate = TaskItemDelegate(self.thumbnails, self.tasks_list)
+        self.tasks_delegate.image_clicked.connect(self.show_image)
+        self.tasks_list.setItemDelegate(self.tasks_delegate)
+        self.tasks_list.setResizeMode(QListView.ResizeMode.Adjust)
+        self.tasks_list.setLayoutMode(QListView.LayoutMode.Batched)
+        self.tasks_list.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.tasks_list.setMouseTracking(True)
+        self.tasks_list.viewport().setAttribute(Qt.WidgetAttribute.WA_Hover)
+        self.tasks_list.setObjectName("tasks_list")
+        self.tasks_list.doubleClicked.connect(self.edit_task)
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Поиск по названию и описанию")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(lambda: self.search_timer.start())
+
+        self.search_archive_checkbox = QCheckBox("Искать и в архиве")
+        self.search_archive_checkbox.toggled.connect(
+            lambda: self.search_tasks() if self.search_input.text().strip() else None)
+
+        self.tags_list = QListWidget()
+        self.tags_list.setMaximumWidth(180)
+        self.tags_list.itemChanged.connect(self.apply_tag_filter)
+
+        lists_layout = QHBoxLayout()
+        lists_layout.addWidget(self.tags_list)
+        lists_layout.addWidget(self.tasks_list, 1)
+
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(self.search_input, 1)
+        search_layout.addWidget(self.search_archive_checkbox)
 
         layout.addLayout(buttons_layout)
-        layout.addWidget(self.tasks_list)
+        layout.addLayout(search_layout)
+        layout.addLayout(lists_layout)
 
         self.tasks_tab.setLayout(layout)
 
-        self.refresh_tasks_list()
-
     def setup_about_tab(self):
         layout = QVBoxLayout()
 
@@ -472,95 +1344,370 @@ class MainWindow(QMainWindow):
         about_text.setAlignment(Qt.AlignmentFlag.AlignTop)
         about_text.setWordWrap(True)
 
+        export_layout = QHBoxLayout()
+
+        self.export_btn = QPushButton("Экспортировать задачи в CSV")
+        self.export_btn.clicked.connect(self.export_tasks)
+
+        self.export_archive_checkbox = QCheckBox("Вместе с архивом")
+
+        self.export_progress = QProgressBar()
+        self.export_progress.hide()
+
+        self.cancel_export_btn = QPushButton("Отмена")
+        self.cancel_export_btn.hide()
+        self.cancel_export_btn.clicked.connect(self.cancel_export)
+
+        export_layout.addWidget(self.export_btn)
+        export_layout.addWidget(self.export_archive_checkbox)
+        export_layout.addWidget(self.export_progress, 1)
+        export_layout.addWidget(self.cancel_export_btn)
+        export_layout.addStretch()
+
+        import_layout = QHBoxLayout()
+
+        self.import_btn = QPushButton("Импортировать задачи из CSV/JSON")
+        self.import_btn.clicked.connect(self.import_tasks)
+
+        self.import_progress = QProgressBar()
+        self.import_progress.hide()
+
+        self.cancel_import_btn = QPushButton("Отмена")
+        self.cancel_import_btn.hide()
+        self.cancel_import_btn.clicked.connect(self.cancel_import)
+
+        import_layout.addWidget(self.import_btn)
+        import_layout.addWidget(self.import_progress, 1)
+        import_layout.addWidget(self.cancel_import_btn)
+        import_layout.addStretch()
+
+        reminders_layout = QHBoxLayout()
+        reminders_layout.addWidget(QLabel("Напоминать о дедлайне за:"))
+
+        self.reminder_checkboxes = {}
+        for offset, label in REMINDER_OFFSET_CHOICES:
+            checkbox = QCheckBox(label)
+            checkbox.setEnabled(False)
+            checkbox.toggled.connect(self.change_reminder_offsets)
+            reminders_layout.addWidget(checkbox)
+            self.reminder_checkboxes[offset] = checkbox
+        reminders_layout.addStretch()
+
+        archive_layout = QHBoxLayout()
+        archive_layout.addWidget(QLabel("Переносить в архив выполненные задачи старше, дней:"))
+
+        self.archive_days_input = QSpinBox()
+        self.archive_days_input.setRange(0, ARCHIVE_MAX_DAYS)
+        self.archive_days_input.setSpecialValueText("никогда")
+        self.archive_days_input.setEnabled(False)
+        self.archive_days_input.editingFinished.connect(self.change_archive_after_days)
+        archive_layout.addWidget(self.archive_days_input)
+        archive_layout.addStretch()
+
         layout.addWidget(about_text)
+        layout.addLayout(export_layout)
+        layout.addLayout(import_layout)
+        layout.addLayout(reminders_layout)
+        layout.addLayout(archive_layout)
+        layout.addStretch()
         self.about_tab.setLayout(layout)
 
+    def export_tasks(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Экспорт задач", "tasks.csv", "CSV (*.csv)")
+        if not path:
+            return
+
+        self.export_thread = CsvExportThread(self.db.db_name, path, self.export_archive_checkbox.isChecked(), self)
+        self.export_thread.progress.connect(self.on_export_progress)
+        self.export_thread.finished_export.connect(self.on_export_finished)
+        self.export_thread.cancelled.connect(self.on_export_stopped)
+        self.export_thread.failed.connect(self.on_export_failed)
+
+        self.export_btn.setEnabled(False)
+        self.export_archive_checkbox.setEnabled(False)
+        self.export_progress.setRange(0, 0)
+        self.export_progress.show()
+        self.cancel_export_btn.show()
+        self.export_thread.start()
+
+    def cancel_export(self):
+        self.export_thread.requestInterruption()
+
+    def on_export_progress(self, exported, total):
+        self.export_progress.setRange(0, total)
+        self.export_progress.setValue(exported)
+
+    def on_export_finished(self, exported):
+        self.on_export_stopped()
+        QMessageBox.information(self, "Экспорт", f"Экспортировано задач: {exported}")
+
+    def on_export_failed(self, message):
+        self.on_export_stopped()
+        QMessageBox.warning(self, "Ошибка", f"Не удалось экспортировать задачи: {message}")
+
+    def on_export_stopped(self):
+        self.export_btn.setEnabled(True)
+        self.export_archive_checkbox.setEnabled(True)
+        self.export_progress.hide()
+        self.cancel_export_btn.hide()
+
+    def import_tasks(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Импорт задач", "",
+                                              "CSV или JSON Lines (*.csv *.jsonl *.json)")
+        if not path:
+            return
+
+        self.import_thread = ImportThread(self.db.db_name, path, self)
+        self.import_thread.progress.connect(self.on_import_progress)
+        self.import_thread.finished_import.connect(self.on_import_finished)
+        self.import_thread.failed.connect(self.on_import_failed)
+
+        self.import_btn.setEnabled(False)
+        self.import_progress.setRange(0, 0)
+        self.import_progress.show()
+        self.cancel_import_btn.show()
+        self.import_thread.start()
+
+    def cancel_import(self):
+        self.import_thread.requestInterruption()
+
+    def on_import_progress(self, processed, total):
+        self.import_progress.setRange(0, total)
+        self.import_progress.setValue(processed)
+
+    def on_import_finished(self, result):
+        self.on_import_stopped()
+
+        message = f"Импортировано задач: {result.imported}\nОтклонено строк: {result.rejected_count}"
+        if result.cancelled:
+            message = f"Импорт прерван, уже добавленные задачи остались в списке.\n{message}"
+        if result.rejected:
+            details = "\n".join(f"Строка {line}: {reason}" for line, reason in result.rejected[:10])
+            message += f"\n\n{details}"
+        QMessageBox.information(self, "Импорт", message)
+
+    def on_import_failed(self, message):
+        self.on_import_stopped()
+        QMessageBox.warning(self, "Ошибка", f"Не удалось импортировать задачи: {message}")
+
+    def on_import_stopped(self):
+        self.import_btn.setEnabled(True)
+        self.import_progress.hide()
+        self.cancel_import_btn.hide()
+
+        self.tasks.reset()
+        self.tasks_model.fetchMore()
+        self.refresh_tags()
+        self.index_search_backlog()
+        self.reminders.invalidate()
+
+    def index_search_backlog(self):
+        self.db.submit('index_search_backlog', on_success=self.on_search_backlog_indexed)
+
+    def on_search_backlog_indexed(self, indexed):
+        if indexed:
+            QTimer.singleShot(0, self.index_search_backlog)
+
+    def on_reminder_offsets_loaded(self, offsets):
+        for offset, checkbox in self.reminder_checkboxes.items():
+            checkbox.blockSignals(True)
+            checkbox.setChecked(offset in offsets)
+            checkbox.setEnabled(True)
+            checkbox.blockSignals(False)
+
+        self.reminders.set_offsets(offsets)
+
+    def on_archive_after_days_loaded(self, days):
+        self.archive_days_input.blockSignals(True)
+        self.archive_days_input.setValue(days)
+        self.archive_days_input.setEnabled(True)
+        self.archive_days_input.blockSignals(False)
+
+    def change_archive_after_days(self):
+        self.db.submit('set_archive_after_days', self.archive_days_input.value(),
+                       on_success=lambda result: self.archive_due_tasks(),
+                       on_error=lambda message: QMessageBox.warning(
+                           self, "Ошибка", f"Не удалось сохранить настройки архива: {message}"))
+
+    def change_reminder_offsets(self):
+        offsets = [offset for offset, checkbox in self.reminder_checkboxes.items() if checkbox.isChecked()]
+        self.db.submit('set_reminder_offsets', offsets,
+                       on_error=lambda message: QMessageBox.warning(
+                           self, "Ошибка", f"Не удалось сохранить настройки напоминаний: {message}"))
+        self.reminders.set_offsets(offsets)
+
+    def show_reminders(self, reminders):
+        offset_labels = dict(REMINDER_OFFSET_CHOICES)
+        lines = [f"{title} — до {format_timestamp(deadline)} (через {offset_labels.get(offset, '')})"
+                 for instant, task_id, offset, title, deadline in reminders[:5]]
+        if len(reminders) > 5:
+            lines.append(f"и ещё {len(reminders) - 5}")
+        message = "\n".join(lines)
+
+        if self.tray_icon is not None:
+            self.tray_icon.showMessage("Напоминание о дедлайне", message,
+                                       QSystemTrayIcon.MessageIcon.Information)
+        else:
+            self.statusBar().showMessage(message.replace("\n", "; "), 15000)
+            QApplication.alert(self)
+
     def create_task(self):
-        dialog = TaskDialog(self)
+        dialog = TaskDialog(self, available_tags=self.tag_names())
         if dialog.exec() == QDialog.DialogCode.Accepted:
             task_data = dialog.get_task_data()
-            task_id = self.db.add_task(task_data)
-            task_data['id'] = task_id
-            task_data['completed'] = False
-            task_data['completed_at'] = None
-
-            self.tasks.append(task_data)
-            self.refresh_tasks_list()
+            if not self.import_image(task_data):
+                return
+            self.db.submit('add_task', task_data,
+                           on_success=lambda task_id: self.on_task_added(task_data, task_id),
+                           on_error=lambda message: self.on_write_failed([], message))
+            self.reminders.invalidate()
+
+    def on_task_added(self, task_data, task_id):
+        task = Task(task_id, task_data['title'], task_data['description'], task_data['deadline'],
+                    task_data['date_of_creation'], image=task_data['image'], tags=tuple(task_data['tags']))
+
+        if self.search_input.text().strip():
+            self.search_tasks()
+        elif self.matches_tag_filter(task):
+            self.tasks.insert(task)
+        self.refresh_tags()
 
     def edit_task(self):
-        current_row = self.tasks_list.currentRow()
+        current_row = self.current_row()
         if current_row == -1:
             QMessageBox.warning(self, "Ошибка", "Выберите задачу для редактирования")
             return
 
         task_data = self.tasks[current_row]
-        dialog = TaskDialog(self, task_data)
+        if self.offer_restore([task_data]):
+            return
+        dialog = TaskDialog(self, task_data, self.tag_names())
 
         if dialog.exec() == QDialog.DialogCode.Accepted:
             updated_task_data = dialog.get_task_data()
-            self.db.update_task(task_data['id'], updated_task_data)
+            if not self.import_image(updated_task_data):
+                return
+            if self.tasks.get(task_data['id']) is None:
+                self.db.submit('update_task', task_data['id'], updated_task_data,
+                               on_success=self.on_unloaded_task_updated,
+                               on_error=lambda message: self.on_write_failed((), message))
+                return
+            snapshots = [dict(task_data)]
+
+            if self.matches_tag_filter(updated_task_data):
+                self.tasks.update(task_data['id'], updated_task_data)
+            else:
+                self.tasks.remove(task_data['id'])
+            self.write('update_task', task_data['id'], updated_task_data,
+                       snapshots=snapshots, on_success=self.refresh_tags)
+
+    def on_unloaded_task_updated(self, updated):
+        if not updated:
+            QMessageBox.information(self, "Информация", "Задача была удалена, пока вы её редактировали")
+            return
+
+        self.reload_changed_tasks()
 
-            updated_task_data['id'] = task_data['id']
-            updated_task_data['completed'] = task_data['completed']
-            updated_task_data['completed_at'] = task_data['completed_at']
+    def import_image(self, task_data):
+        image_source = task_data.pop('image_source', None)
+        if image_source is None:
+            return True
 
-            self.tasks[current_row] = updated_task_data
-            self.refresh_tasks_list()
+        try:
+            task_data['image'] = self.attachments.import_file(image_source)
+        except OSError as error:
+            QMessageBox.warning(self, "Ошибка", f"Не удалось прикрепить картинку: {error}")
+            return False
+        self.thumbnails.forget(task_data['image'])
+        return True
+
+    def show_image(self, name):
+        ImageViewerDialog(self.attachments.path_for(name), self).exec()
 
     def complete_task(self):
-        current_row = self.tasks_list.currentRow()
-        if current_row == -1:
+        selected_tasks = self.selected_tasks()
+        if not selected_tasks:
             QMessageBox.warning(self, "Ошибка", "Выберите задачу для выполнения")
             return
+        if self.offer_restore(selected_tasks):
+            return
 
-        task_data = self.tasks[current_row]
-        if not task_data['completed']:
-            self.db.complete_task(task_data['id'])
-
-            task_data['completed'] = True
-            task_data['completed_at'] = QDateTime.currentDateTime().toString("dd.MM.yyyy HH:mm")
+        snapshots = [dict(task) for task in selected_tasks if not task['completed']]
+        if snapshots:
+            task_ids = [task['id'] for task in snapshots]
+            completed_at = QDateTime.currentSecsSinceEpoch()
 
-            self.refresh_tasks_list()
+            self.tasks.update_many(task_ids, {'completed': True, 'completed_at': completed_at})
+            self.write('bulk_complete', task_ids, completed_at, snapshots=snapshots)
 
     def uncomplete_task(self):
-        current_row = self.tasks_list.currentRow()
-        if current_row == -1:
+        selected_tasks = self.selected_tasks()
+        if not selected_tasks:
             QMessageBox.warning(self, "Ошибка", "Выберите задачу для возврата в работу")
             return
+        if self.offer_restore(selected_tasks):
+            return
 
-        task_data = self.tasks[current_row]
-        if task_data['completed']:
-            self.db.uncomplete_task(task_data['id'])
-
-            task_data['completed'] = False
-            task_data['completed_at'] = None
+        snapshots = [dict(task) for task in selected_tasks if task['completed']]
+        if snapshots:
+            task_ids = [task['id'] for task in snapshots]
 
-            self.refresh_tasks_list()
+            self.tasks.update_many(task_ids, {'completed': False, 'completed_at': None})
+            self.write('bulk_uncomplete', task_ids, snapshots=snapshots)
 
     def delete_task(self):
-        current_row = self.tasks_list.currentRow()
-        if current_row == -1:
+        selected_tasks = self.selected_tasks()
+        if not selected_tasks:
             QMessageBox.warning(self, "Ошибка", "Выберите задачу для удаления")
             return
+        if self.offer_restore(selected_tasks):
+            return
 
-        task_data = self.tasks[current_row]
+        if len(selected_tasks) == 1:
+            question = f"Вы уверены, что хотите удалить задачу '{selected_tasks[0]['title']}'?"
+        else:
+            question = f"Вы уверены, что хотите удалить выбранные задачи ({len(selected_tasks)})?"
 
         reply = QMessageBox.question(
             self,
             "Подтверждение удаления",
-            f"Вы уверены, что хотите удалить задачу '{task_data['title']}'?",
+            question,
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+
+        if reply == QMessageBox.StandardButton.Yes:
+            task_ids = {task['id'] for task in selected_tasks}
+
+            removed = self.tasks.remove_where(lambda task: task['id'] in task_ids)
+            self.write('bulk_delete', list(task_ids), snapshots=removed, on_success=self.refresh_tags)
+
+    def offer_restore(self, tasks):
+        task_ids = [task['id'] for task in tasks if task['archived']]
+        if not task_ids:
+            return False
+
+        reply = QMessageBox.question(
+            self,
+            "Задачи в архиве",
+            "Задачи из архива нельзя изменить. Вернуть их в список?",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
 
         if reply == QMessageBox.StandardButton.Yes:
-            self.db.delete_task(task_data['id'])
+            self.db.submit('restore_archived_tasks', task_ids, on_success=self.on_archived_tasks_restored,
+                           on_error=lambda message: self.on_write_failed((), message))
+        return True
 
-            del self.tasks[current_row]
-            self.refresh_tasks_list()
+    def on_archived_tasks_restored(self, task_ids):
+        for task_id in task_ids:
+            self.tasks.update(task_id, {'archived': False})
+        self.refresh_tags()
 
     def clear_completed(self):
-        completed_tasks = [task for task in self.tasks if task['completed']]
-        if not completed_tasks:
+        self.db.submit('has_completed_tasks', on_success=self.confirm_clear_completed)
+
+    def confirm_clear_completed(self, has_completed_tasks):
+        if not has_completed_tasks:
             QMessageBox.information(self, "Информация", "Нет выполненных задач для очистки")
             return
 
@@ -572,46 +1719,186 @@ class MainWindow(QMainWindow):
         )
 
         if reply == QMessageBox.StandardButton.Yes:
-            self.db.clear_completed_tasks()
+            removed = self.tasks.remove_where(lambda task: task['completed'])
+            self.write('clear_completed_tasks', snapshots=removed, on_success=self.refresh_tags)
+
+    def write(self, method_name, *args, snapshots=(), on_success=None):
+        self.db.submit(method_name, *args,
+                       on_success=lambda result: on_success() if on_success else None,
+                       on_error=lambda message: self.on_write_failed(snapshots, message))
+        self.reminders.invalidate()
+
+    def on_write_failed(self, snapshots, message):
+        for task_data in snapshots:
+            self.tasks.restore(task_data)
+        self.reminders.invalidate()
+
+        QMessageBox.warning(self, "Ошибка", f"Не удалось сохранить изменения: {message}")
+
+    def search_tasks(self):
+        query = self.search_input.text().strip()
+        if not query:
+            self.tasks.reset()
+            self.tasks_model.fetchMore()
+            return
+
+        self.db.submit('search', query, SEARCH_RESULTS_LIMIT, self.search_archive_checkbox.isChecked(),
+                       on_success=lambda tasks: self.on_search_finished(query, tasks))
+
+    def on_search_finished(self, query, tasks):
+        if query != self.search_input.text().strip():
+            return
+
+        self.tasks.reset(tasks)
+
+    def load_tasks_page(self, after_key, limit, on_loaded):
+        if self.tag_filter:
+            self.db.submit('get_tasks_by_tags', self.tag_filter, (), (), after_key, limit, on_success=on_loaded,
+                           on_error=self.on_load_failed)
+        else:
+            self.db.submit('get_tasks_page', after_key, limit, on_success=on_loaded, on_error=self.on_load_failed)
+
+    def on_load_failed(self, message):
+        QMessageBox.warning(self, "Ошибка", f"Не удалось загрузить задачи: {message}")
+
+    def poll_data_version(self):
+        if self.polling_data_version:
+            return
+
+        self.polling_data_version = True
+        self.db.submit('data_version', on_success=self.on_data_version, on_error=self.on_data_version_failed)
+
+    def on_data_version(self, data_version):
+        self.polling_data_version = False
+        if self.data_version is not None and data_version != self.data_version:
+            self.reload_changed_tasks()
+        self.data_version = data_version
+
+    def on_data_version_failed(self, message):
+        self.polling_data_version = False
+
+    def reload_changed_tasks(self):
+        self.refresh_tags()
+        self.reminders.invalidate()
+
+        if self.search_input.text().strip():
+            self.search_tasks()
+        else:
+            self.reload_loaded_tasks()
+
+    def on_change_version(self, change_version):
+        self.change_version = change_version
+
+    def reload_loaded_tasks(self):
+        if self.change_version is None:
+            self.reload_loaded_window()
+            return
+
+        version = self.tasks.version
+        self.db.submit('changes_since', self.change_version, self.tag_filter,
+                       on_success=lambda changes: self.on_changes_loaded(changes, version))
 
-            self.tasks = [task for task in self.tasks if not task['completed']]
-            self.refresh_tasks_list()
+    def on_changes_loaded(self, changes, version):
+        if changes is None:
+            self.reload_loaded_window()
+            return
+        if version != self.tasks.version:
+            self.reload_loaded_tasks()
+            return
 
-    def refresh_tasks_list(self):
-        self.tasks_list.clear()
+        self.change_version = changes.version
+        self.tasks.apply_changes(changes.tasks, changes.removed_ids)
+
+    def reload_loaded_window(self):
+        self.db.submit('change_version', on_success=self.on_change_version)
+        if self.tasks.has_more and not self.tasks.keys:
+            return
+
+        version = self.tasks.version
+        limit = min(max(len(self.tasks), TASKS_PAGE_SIZE), RELOAD_WINDOW_SIZE)
+        self.load_tasks_page(None, limit, lambda tasks: self.on_loaded_tasks_reloaded(tasks, limit, version))
+
+    def on_loaded_tasks_reloaded(self, tasks, limit, version):
+        if version != self.tasks.version:
+            self.reload_loaded_window()
+            return
 
-        for task_data in self.tasks:
-            task_widget = TaskItemWidget(task_data)
+        self.tasks.sync(tasks, len(tasks) == limit)
 
-            list_item = QListWidgetItem(self.tasks_list)
-            list_item.setSizeHint(task_widget.sizeHint())
+    def maintain_database(self):
+        self.db.submit('compact_changes')
+        self.archive_due_tasks()
 
-            self.tasks_list.addItem(list_item)
-            self.tasks_list.setItemWidget(list_item, task_widget)
+    def archive_due_tasks(self):
+        self.db.submit('archive_due_tasks', on_success=self.on_due_tasks_archived)
+
+    def on_due_tasks_archived(self, archived):
+        if archived:
+            self.reload_changed_tasks()
+            QTimer.singleShot(0, self.archive_due_tasks)
+
+    def refresh_tags(self):
+        self.db.submit('get_tags', on_success=self.on_tags_loaded)
+
+    def on_tags_loaded(self, tags):
+        self.tags = tags
+
+        self.tags_list.blockSignals(True)
+        self.tags_list.clear()
+        for name, task_count in tags:
+            item = QListWidgetItem(f"{name} ({task_count})", self.tags_list)
+            item.setData(Qt.ItemDataRole.UserRole, name)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            checked = tag_key(name) in {tag_key(tag) for tag in self.tag_filter}
+            item.setCheckState(Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked)
+        self.tags_list.blockSignals(False)
+
+    def tag_names(self):
+        return [name for name, task_count in self.tags]
+
+    def apply_tag_filter(self):
+        self.tag_filter = tuple(
+            self.tags_list.item(row).data(Qt.ItemDataRole.UserRole)
+            for row in range(self.tags_list.count())
+            if self.tags_list.item(row).checkState() == Qt.CheckState.Checked
+        )
+
+        self.tasks.reset()
+        self.tasks_model.fetchMore()
+
+    def matches_tag_filter(self, task_data):
+        task_tags = {tag_key(tag) for tag in task_data.get('tags', ())}
+        return all(tag_key(tag) in task_tags for tag in self.tag_filter)
+
+    def current_row(self):
+        index = self.tasks_list.currentIndex()
+        return index.row() if index.isValid() else -1
+
+    def selected_tasks(self):
+        rows = sorted(index.row() for index in self.tasks_list.selectionModel().selectedIndexes())
+        return [self.tasks[row] for row in rows]
 
 
 if __name__ == "__main__":
+    profiler = None
+    if "--startup-profile" in sys.argv:
+        sys.argv.remove("--startup-profile")
+        profiler = StartupProfiler(STARTUP_STARTED)
+        profiler.mark("импорт модулей")
+
     app = QApplication(sys.argv)
+    app.setStyleSheet(THEME_STYLESHEET)
 
-    app.setStyleSheet("""
-        QMainWindow {
-            background-color: #f0f0f0;
-        }
-        QTabWidget::pane {
-            border: 1px solid #C2C7CB;
-            background-color: white;
-        }
-        QTabBar::tab {
-            background-color: #E1E1E1;
-            border: 1px solid #C4C4C3;
-            padding: 8px 20px;
-        }
-        QTabBar::tab:selected {
-            background-color: white;
-            border-bottom-color: white;
-        }
-    """)
+    if profiler is not None:
+        profiler.mark("QApplication и стили")
 
     window = MainWindow()
+    if profiler is not None:
+        profiler.mark("создание MainWindow")
+
     window.show()
+    if profiler is not None:
+        profiler.mark("show()")
+        profiler.watch(window)
+
     sys.exit(app.exec())
\ No newline at end of file